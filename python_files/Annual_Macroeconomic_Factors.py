@@ -1,9 +1,10 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import os
 import streamlit as st
 
+from python_files import incremental, prefetch, resample, schema, storage
+
 # =========================================================
 # 1) Function: Load and clean dataset
 # =========================================================
@@ -12,14 +13,19 @@ def load_data():
     sheet = "in"
 
     # Load excel file
-    T = pd.read_excel(file, sheet_name=sheet)
+    T = prefetch.read_excel(file, sheet_name=sheet)
+
+    # Check the sheet against its schema
+    report = schema.validate(T, "annual_macro")
+    if report.missing:
+        raise ValueError(f"Missing required columns: {report.missing}")
+    if not report.ok:
+        st.warning("⚠️ Schema violations found in the spreadsheet:")
+        st.dataframe(report.violations[report.violations["count"] > 0])
 
-    # Ensure Date is datetime
-    if not np.issubdtype(T["Date"].dtype, np.datetime64):
-        try:
-            T["Date"] = pd.to_datetime(T["Date"])
-        except:
-            T["Date"] = pd.to_datetime(T["Date"], format="%Y-%m-%d")
+    # Rows without a usable date can't be placed in the series
+    T = T[report.row_mask(["Date"])].copy()
+    T["Date"] = pd.to_datetime(T["Date"])
 
     # Clean numeric variables
     numVars = [c for c in T.columns if c != "Date"]
@@ -34,9 +40,10 @@ def load_data():
     # Add decade column
     Tclean["Decade"] = (Tclean["Date"].dt.year // 10) * 10
 
-    # Save cleaned data
-    os.makedirs("output", exist_ok=True)
-    Tclean.to_csv("output/Annual_Macro_Clean.csv", index=False)
+    # Append only the years added since the last run to the stored series
+    incremental.update(Tclean, "Annual_Macro_Clean", key="Date", value_cols=numVars)
+    # Plain Feather/Parquet copy for table readers; the CSV is kept by the update
+    storage.save_table(Tclean, "Annual_Macro_Clean", formats=("feather", "parquet"))
 
     return Tclean
 
@@ -93,15 +100,17 @@ def make_plots(Tclean):
     st.pyplot(fig)
 
     # --- Decadal Summary ---
-    decTbl = (
-        Tclean.groupby("Decade")[["Mortgage_Rate", "Unemployment_Rate"]]
-        .mean()
-        .reset_index()
-        .rename(columns={
-            "Mortgage_Rate": "Avg_Mortgage_Rate",
-            "Unemployment_Rate": "Avg_Unemployment_Rate"
-        })
-    )
+    cols = ["Mortgage_Rate", "Unemployment_Rate"]
+    decTbl = incremental.decade_means("Annual_Macro_Clean")
+    if decTbl.empty:
+        # No stored series yet (make_plots called on its own)
+        decTbl = resample.MultiResolution(Tclean, columns=cols).frame("Decade")
+        decTbl.index = decTbl.index.year.rename("Decade")
+    decTbl = decTbl[cols].reset_index()
+    decTbl = decTbl.rename(columns={
+        "Mortgage_Rate": "Avg_Mortgage_Rate",
+        "Unemployment_Rate": "Avg_Unemployment_Rate"
+    })
 
     # Bar charts
     fig, ax = plt.subplots(figsize=(7,4))
@@ -1,9 +1,10 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 import os
 import streamlit as st  
 
+from python_files import incremental, prefetch, schema
+
 
 def main():
     """Streamlit version — cleans and plots Homelessness Trends (2007–2024)."""
@@ -25,12 +26,21 @@ def main():
         return
 
     try:
-        df = pd.read_excel(in_file)
+        df = prefetch.read_excel(in_file)
         st.success("Data loaded successfully.")
     except Exception as e:
         st.error(f"Error loading file: {e}")
         return
 
+    report = schema.validate(df, "homeless_years")
+    for col in report.missing:
+        st.error(f'❌ Required column "{col}" is missing from spreadsheet.')
+    if report.missing:
+        return
+    if not report.ok:
+        st.warning("⚠️ Schema violations found in the spreadsheet:")
+        st.dataframe(report.violations[report.violations["count"] > 0])
+
     # Show sample of the data
     st.write("### 🔎 Preview of Dataset")
     st.dataframe(df.head())
@@ -41,6 +51,17 @@ def main():
     years = df["year"]
     counts = df["Overall Homeless"]
 
+    # Store only the years added since the last run (append-only)
+    update = incremental.update(df, "Homeless_Clean", key="year",
+                                value_cols=["Overall Homeless"], out_dir=out_dir)
+    new_rows = update["new_rows"]
+    if update["rebuilt"]:
+        st.warning("Earlier years changed in the workbook — stored series rebuilt.")
+    elif len(new_rows):
+        st.info(f"➕ Appended {len(new_rows)} new year(s) to the stored series.")
+    else:
+        st.info("No new years since the last run.")
+
     # ---------------------------------------------
     # 3. Create Plot
     # ---------------------------------------------
@@ -87,4 +108,14 @@ def main():
 
     st.success(f"📁 Graph saved to: {out_path}")
 
+    # ---------------------------------------------
+    # 5. Derived aggregates (maintained incrementally)
+    # ---------------------------------------------
+    st.subheader("📊 Decade Averages & Year-over-Year Change")
+    col1, col2 = st.columns(2)
+    col1.dataframe(update["decades"].round(0))
+    series = incremental.load("Homeless_Clean", out_dir, changes=True)
+    col2.dataframe(series[["year", "Overall Homeless_YoY_Change",
+                           "Overall Homeless_YoY_Pct"]].tail(5).round(2), hide_index=True)
+
     return fig
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import streamlit as st
 import os
 
+from python_files import anomalies, dedup, prefetch, report_utils, schema, stats, storage
+
 def main():
     st.header("🏡 Housing Dataset Analysis")
 
@@ -15,12 +17,21 @@ def main():
 
     st.subheader("📂 Loading Dataset")
     try:
-        T = pd.read_excel(file, sheet_name=sheet)
+        T = prefetch.read_excel(file, sheet_name=sheet)
         st.success(f"Loaded: {file}")
     except Exception as e:
         st.error(f"Error loading file: {e}")
         return
 
+    report = schema.validate(T, "housing")
+    for col in report.missing:
+        st.error(f'❌ Required column "{col}" is missing from spreadsheet.')
+    if report.missing:
+        return
+    if not report.ok:
+        st.warning("⚠️ Schema violations found in the spreadsheet:")
+        st.dataframe(report.violations[report.violations["count"] > 0])
+
     # ---------------------------------------------------------
     # 2) Handle missing or invalid values
     # ---------------------------------------------------------
@@ -36,23 +47,28 @@ def main():
 
     # Drop rows missing key data
     Tclean = T.dropna(subset=['price', 'area'])
+
+    # Relisted / syndicated copies of the same property count once
+    Tclean, dupes = dedup.dedupe(Tclean, history=dedup.FingerprintStore("Housing"))
+    st.write(f"**Duplicate listings removed:** {dupes['exact_duplicates']} "
+             f"({dupes['seen_before']} listings already seen in earlier feeds, "
+             f"{dupes['added_to_history']} new)")
+
+    # Outliers: robust rules within each bedrooms x furnishing group
+    st.subheader("🚩 Outlier Detection")
+    detector = anomalies.RobustDetector(isolation_forest=True).fit(Tclean)
+    flags = detector.flag(Tclean)
+    st.dataframe(anomalies.rule_counts(flags), hide_index=True)
+    st.caption("Rows flagged by the invalid and MAD rules are removed; "
+               "IQR and isolation-forest flags are reported only.")
+    Tclean = Tclean[~detector.to_drop(flags).to_numpy()]
     st.success(f"Cleaned dataset: {len(Tclean)} rows remaining.")
 
     # ---------------------------------------------------------
     # 3) Summary statistics for Price
     # ---------------------------------------------------------
     st.subheader("📊 Summary Statistics — Price")
-    x = Tclean['price']
-
-    st.write({
-        "Count": int(x.count()),
-        "Mean": float(x.mean()),
-        "Std": float(x.std()),
-        "Min": float(x.min()),
-        "Median": float(x.median()),
-        "Max": float(x.max()),
-        "Sum": float(x.sum())
-    })
+    st.write(stats.summarize(Tclean['price']))
 
     # ---------------------------------------------------------
     # 4) Most common categorical features
@@ -79,7 +95,7 @@ def main():
 
     # --- Scatter: Area vs Price ---
     fig, ax = plt.subplots(figsize=(7,5))
-    ax.scatter(Tclean["area"], Tclean["price"])
+    report_utils.scatter(ax, Tclean["area"], Tclean["price"])
     ax.set_xlabel("Area")
     ax.set_ylabel("Price")
     ax.set_title("House Price vs Area")
@@ -131,10 +147,18 @@ def main():
     # ---------------------------------------------------------
     st.subheader("💾 Saving Output")
 
-    os.makedirs("output", exist_ok=True)
-    Tclean.to_csv("output/Housing_Clean.csv", index=False)
+    out_path = storage.save_table(Tclean, "Housing_Clean")
+
+    st.success(f"Cleaned dataset saved to {out_path} (+ Parquet/CSV copies)")
 
-    st.success("Cleaned dataset saved to output/Housing_Clean.csv")
+    # Partitioned copy so filtered reads (e.g. 3-bedroom furnished) skip the rest
+    manifest = storage.save_partitioned(
+        Tclean, "Housing_Clean", ["bedrooms", "furnishingstatus"]
+    )
+    st.success(
+        f"Partitioned dataset saved to output/Housing_Clean/ "
+        f"({len(manifest['partitions'])} partitions)"
+    )
 
     st.success("🏁 Housing analysis complete!")
 
@@ -4,6 +4,8 @@ from pathlib import Path
 import os
 import streamlit as st
 
+from python_files import leadlag, prefetch, resample, schema
+
 
 def main():
     """Housing Macroeconomic Factors Analysis (Streamlit-compatible)"""
@@ -24,7 +26,7 @@ def main():
 
     # Load Excel
     try:
-        df = pd.read_excel(in_file)
+        df = prefetch.read_excel(in_file)
         st.success("📄 File loaded successfully.")
     except Exception as e:
         st.error(f"❌ Could not read Excel file: {e}")
@@ -33,15 +35,16 @@ def main():
     # ---------------------------------------------------
     # 2. Validate Required Columns
     # ---------------------------------------------------
-    required_cols = [
-        "Date", "house_price_index", "mortgage_rate",
-        "gdp", "employment_rate"
-    ]
+    report = schema.validate(df, "housing_macro")
+
+    for col in report.missing:
+        st.error(f'❌ Required column "{col}" is missing from spreadsheet.')
+    if report.missing:
+        return
 
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f'❌ Required column "{col}" is missing from spreadsheet.')
-            return
+    if not report.ok:
+        st.warning("⚠️ Schema violations found in the spreadsheet:")
+        st.dataframe(report.violations[report.violations["count"] > 0])
 
     # Clean & Sort
     df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
@@ -106,6 +109,83 @@ def main():
                  dpi=300, bbox_inches="tight")
 
     # ---------------------------------------------------
-    # 5. Complete
+    # 5. Multi-resolution View (rolling stats per resolution)
+    # ---------------------------------------------------
+    st.subheader("🔍 Rolling Trends by Resolution")
+
+    engine = resample.MultiResolution(
+        df, columns=["house_price_index", "mortgage_rate", "gdp", "employment_rate"])
+    tabs = st.tabs(list(resample.RESOLUTIONS))
+
+    for tab, res in zip(tabs, resample.RESOLUTIONS):
+        window = resample.RESOLUTIONS[res][1]
+        frame = engine.frame(res)
+        rolling = engine.rolling(res)
+        reg = engine.regression(res, "house_price_index", "mortgage_rate")
+
+        fig, axes = plt.subplots(3, 1, figsize=(10, 8), sharex=True)
+        axes[0].plot(frame.index, frame["house_price_index"], label="HPI")
+        axes[0].plot(rolling.index, rolling["house_price_index_mean"],
+                     label=f"{window}-period mean")
+        axes[0].set_ylabel("HPI")
+        axes[0].legend(loc="best")
+        axes[0].grid(True)
+
+        axes[1].plot(rolling.index, rolling["house_price_index_yoy"], label="HPI YoY %")
+        axes[1].plot(rolling.index, rolling["house_price_index_vol"], label="HPI volatility")
+        axes[1].axhline(0, color="grey", linewidth=0.8)
+        axes[1].set_ylabel("Percent")
+        axes[1].legend(loc="best")
+        axes[1].grid(True)
+
+        axes[2].plot(reg.index, reg["slope"])
+        axes[2].set_ylabel("HPI per 1pt mortgage rate")
+        axes[2].set_title(f"Rolling {window}-period regression: HPI on mortgage rate")
+        axes[2].grid(True)
+
+        fig.suptitle(f"{res} House Price Trends", fontsize=14)
+        fig.tight_layout()
+
+        with tab:
+            st.pyplot(fig)
+            st.dataframe(frame.join(rolling).join(reg.add_prefix("hpi_on_rate_")).tail(12))
+
+    # ---------------------------------------------------
+    # 6. Lead/Lag Analysis (FFT cross-correlation)
+    # ---------------------------------------------------
+    st.subheader("⏱️ Lead/Lag Between Macro Drivers")
+    st.caption("Month-over-month changes; a positive lag means the row series "
+               "leads the column series by that many months.")
+
+    columns = [c for c in df.columns if c != "Date" and pd.api.types.is_numeric_dtype(df[c])]
+    lags, pairs, corr = leadlag.cross_correlation(df, columns, max_lag=24)
+    peaks = leadlag.peak_table(lags, pairs, corr)
+    corr_mat = leadlag.peak_matrix(peaks, columns, "peak_corr")
+    lag_mat = leadlag.peak_matrix(peaks, columns, "peak_lag")
+
+    fig3, ax = plt.subplots(figsize=(10, 8))
+    im = ax.imshow(corr_mat.to_numpy(), cmap="RdBu_r", vmin=-1, vmax=1)
+    ax.set_xticks(range(len(columns)), columns, rotation=45, ha="right")
+    ax.set_yticks(range(len(columns)), columns)
+    for r in range(len(columns)):
+        for c in range(len(columns)):
+            if r != c and not pd.isna(lag_mat.iat[r, c]):
+                ax.text(c, r, f"{int(lag_mat.iat[r, c]):+d}", ha="center", va="center",
+                        fontsize=7)
+    fig3.colorbar(im, ax=ax, label="Peak cross-correlation")
+    ax.set_title("Peak Correlation (labels: lag in months)")
+    fig3.tight_layout()
+
+    st.pyplot(fig3)
+
+    fig3.savefig(os.path.join(out_dir, "Lead_Lag_Heatmap.png"),
+                 dpi=300, bbox_inches="tight")
+
+    hpi = peaks[(peaks["x"] == "house_price_index") | (peaks["y"] == "house_price_index")]
+    st.write("**House price index vs. each driver**")
+    st.dataframe(hpi, hide_index=True)
+
+    # ---------------------------------------------------
+    # 7. Complete
     # ---------------------------------------------------
     st.success("✅ Housing Macroeconomic Factors analysis completed.")
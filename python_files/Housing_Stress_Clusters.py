@@ -0,0 +1,91 @@
+import pandas as pd
+import matplotlib.pyplot as plt
+import plotly.express as px
+import os
+import streamlit as st
+
+from python_files import clustering, geo, storage
+
+
+def main():
+    """Cluster states/counties by population growth, poverty and unemployment."""
+
+    st.header("🧭 Housing-Stress Clusters")
+    out_dir = "output"
+
+    # ---------------------------------------------------
+    # 1. Load the joined panel
+    # ---------------------------------------------------
+    if not os.path.exists(storage.table_path("State_Panel", out_dir)):
+        st.error("❌ `State_Panel` not found — run the State Panel module first.")
+        return
+
+    panel = storage.load_table("State_Panel", out_dir)
+    frame, X = clustering.build_features(panel)
+
+    if len(frame) < 3:
+        st.error("❌ Not enough areas with features to cluster.")
+        return
+
+    st.write(f"Clustering **{len(frame)}** areas on {frame.shape[1]} features: "
+             + ", ".join(f"`{c}`" for c in frame.columns))
+
+    # ---------------------------------------------------
+    # 2. Parallel k sweep (cached by input hash)
+    # ---------------------------------------------------
+    fits = clustering.sweep(X, ks=range(2, 9))
+    best = clustering.best_fit(fits)
+
+    sweep_tbl = pd.DataFrame([{k: f[k] for k in ("k", "inertia", "silhouette")} for f in fits])
+
+    fig, ax1 = plt.subplots(figsize=(8, 4))
+    ax1.plot(sweep_tbl["k"], sweep_tbl["inertia"], "-o", label="Inertia")
+    ax1.set_xlabel("Number of clusters (k)")
+    ax1.set_ylabel("Inertia")
+    ax1.grid(True)
+    ax2 = ax1.twinx()
+    ax2.plot(sweep_tbl["k"], sweep_tbl["silhouette"], "-s", color="tab:orange",
+             label="Silhouette")
+    ax2.set_ylabel("Silhouette")
+    ax1.axvline(best["k"], color="grey", linestyle="--")
+    ax1.set_title(f"k Sweep (best k = {best['k']})")
+    st.pyplot(fig)
+
+    # ---------------------------------------------------
+    # 3. Cluster map
+    # ---------------------------------------------------
+    areas = panel.loc[frame.index, ["FIPS", "Name"]].reset_index(drop=True)
+    areas["Cluster"] = best["labels"]
+    areas["State"] = geo.state_abbr(areas["FIPS"])
+
+    st.subheader("🗺️ Cluster Map")
+    is_state = areas["FIPS"].str.len().eq(2).all()
+    if is_state:
+        fig_map = px.choropleth(
+            areas.dropna(subset=["State"]), locations="State", locationmode="USA-states",
+            color=areas["Cluster"].astype(str).loc[areas["State"].notna()],
+            scope="usa", hover_name="Name",
+            category_orders={"color": [str(c) for c in sorted(areas["Cluster"].unique())]},
+            labels={"color": "Cluster"},
+        )
+        st.plotly_chart(fig_map)
+    else:
+        st.info("Map is drawn for state-level panels only; see the table below.")
+
+    # ---------------------------------------------------
+    # 4. Per-cluster profiles
+    # ---------------------------------------------------
+    st.subheader("📋 Cluster Profiles")
+    st.dataframe(clustering.profiles(frame.reset_index(drop=True), best["labels"]).round(3))
+
+    with st.expander("Areas by cluster"):
+        st.dataframe(areas.sort_values(["Cluster", "Name"]), hide_index=True)
+
+    storage.save_table(areas, "State_Clusters", out_dir)
+    st.success(f"✅ Grouped {len(areas)} areas into {best['k']} clusters.")
+
+    return areas
+
+
+if __name__ == "__main__":
+    main()
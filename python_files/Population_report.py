@@ -6,6 +6,8 @@ import os
 import re
 from pathlib import Path
 
+from python_files import geo, growth, prefetch, report_utils, schema, snapshots, stats, storage
+
 def main():
     st.header("📈 US Population Report Analysis")
 
@@ -17,7 +19,7 @@ def main():
 
     st.subheader("📂 Loading Dataset")
     try:
-        raw = pd.read_excel(file, sheet_name=sheet, header=None)
+        raw = prefetch.read_excel(file, sheet_name=sheet, header=None)
         st.success(f"Loaded: {file}")
     except Exception as e:
         st.error(f"Error loading the dataset: {e}")
@@ -142,6 +144,10 @@ def main():
 
     U = pd.DataFrame(U_data)
 
+    fips = geo.fips_column(data)
+    if fips is not None:
+        U["FIPS"] = fips
+
     # --------------------------------------------
     # 5. Clean dataset
     # --------------------------------------------
@@ -152,12 +158,26 @@ def main():
 
     # Convert numeric columns
     for col in U.columns:
-        if col != "Name":
+        if col not in ("Name", "FIPS"):
             U[col] = pd.to_numeric(U[col], errors="coerce")
 
-    # Remove national row
+    # Remove national / regional (and, for county files, state) rows
+    level = "state"
     if "Name" in U.columns:
-        U = U[~U["Name"].str.lower().eq("united states")]
+        U, level = geo.drop_aggregate_rows(U, fips_col="FIPS")
+    areas = geo.level_label(level)
+
+    # FIPS keys for the geography hierarchy when the sheet has none
+    # (abbreviations, footnotes and typos in state names are resolved too)
+    if "Name" in U.columns and "FIPS" not in U.columns and level == "state":
+        U = U.assign(FIPS=geo.resolve_fips(U["Name"]))
+
+    report = schema.validate(U, "population")
+    if not report.ok:
+        st.warning("⚠️ Schema violations in the cleaned table:")
+        if report.missing:
+            st.write("Missing columns:", report.missing)
+        st.dataframe(report.violations[report.violations["count"] > 0])
 
     st.success(f"✔ Cleaned dataset: {len(U)} rows")
 
@@ -169,38 +189,27 @@ def main():
     else:
         st.subheader("📊 Summary Statistics — Population 2023")
 
-        x = U["Pop_2023"].dropna()
-
-        st.write({
-            "Count": len(x),
-            "Mean": float(x.mean()),
-            "Std": float(x.std()),
-            "Min": float(x.min()),
-            "Median": float(x.median()),
-            "Max": float(x.max()),
-            "Sum": float(x.sum())
-        })
+        st.write(stats.summarize(U["Pop_2023"]))
 
         # Histogram
         fig, ax = plt.subplots(figsize=(8,4))
-        ax.hist(U["Pop_2023"] / 1e6, bins="auto")
+        report_utils.plot_histogram(ax, U["Pop_2023"] / 1e6, bins=30)
         ax.grid(True)
         ax.set_xlabel("Population (millions)")
-        ax.set_ylabel("States")
+        ax.set_ylabel(areas)
         ax.set_title("Distribution of Population (2023)")
         st.pyplot(fig)
 
         # Top 10
         if "Name" in U.columns:
-            st.subheader("🏆 Top 10 Most Populated States (2023)")
-            sorted_df = U.sort_values("Pop_2023", ascending=False)
-            top10 = sorted_df.head(10)
+            st.subheader(f"🏆 Top 10 Most Populated {areas} (2023)")
+            top10 = report_utils.top_k(U, "Pop_2023", 10)
 
             fig, ax = plt.subplots(figsize=(8,6))
             ax.barh(top10["Name"], top10["Pop_2023"] / 1e6)
             ax.invert_yaxis()
             ax.set_xlabel("Population (millions)")
-            ax.set_title("Top 10 States by Population — 2023")
+            ax.set_title(f"Top 10 {areas} by Population — 2023")
             ax.grid(True)
             st.pyplot(fig)
 
@@ -209,7 +218,7 @@ def main():
             st.subheader("📈 Growth: 1990 → 2023")
 
             fig, ax = plt.subplots(figsize=(8,6))
-            ax.scatter(U["Pop_1990"] / 1e6, U["Pop_2023"] / 1e6)
+            report_utils.scatter(ax, U["Pop_1990"] / 1e6, U["Pop_2023"] / 1e6)
             ax.grid(True)
             ax.set_xlabel("Population 1990 (millions)")
             ax.set_ylabel("Population 2023 (millions)")
@@ -219,12 +228,70 @@ def main():
             ax.plot([0, max_val], [0, max_val], "--")
             st.pyplot(fig)
 
+        # Roll-ups: every level is aggregated once, cached on disk by input hash
+        if "FIPS" in U.columns and U["FIPS"].notna().any():
+            st.subheader("🗺️ Population by Geographic Level")
+            pop_cols = [c for c in U.columns if c.startswith("Pop_")]
+            rollups = [(pop_cols, "sum", None)]
+            if "Change_2020_23" in U.columns and "Pop_2020" in U.columns:
+                rollups.append((["Change_2020_23"], "mean", "Pop_2020"))
+            level_tables = geo.rollup_tables(U, rollups)
+
+            tabs = st.tabs([geo.level_label(lvl) for lvl in level_tables])
+            for tab, tbl in zip(tabs, level_tables.values()):
+                with tab:
+                    st.dataframe(tbl, hide_index=True)
+
     # --------------------------------------------
-    # 7. Save cleaned output
+    # 7. Growth rates and projections
     # --------------------------------------------
-    output_file = os.path.join(out_dir, "Population_Clean.csv")
-    U.to_csv(output_file, index=False)
+    pop_years = [c for c in U.columns if re.fullmatch(r"Pop_\d{4}", c)]
+    if "Name" in U.columns and len(pop_years) >= 2:
+        st.subheader("🚀 Growth Rates & Projections")
+        growth_tables = growth.tables(U.reset_index(drop=True))
+
+        proj = growth_tables["projections"].sort_values("Trend_Growth_Pct", ascending=False)
+        tab_proj, tab_cagr, tab_accel = st.tabs(["Projections", "CAGR (%)", "Acceleration (pp)"])
+        with tab_proj:
+            st.caption(f"Log-linear trend fitted per area, "
+                       f"{growth.LEVEL:.0%} prediction intervals")
+            st.dataframe(proj, hide_index=True)
+        with tab_cagr:
+            st.dataframe(growth_tables["cagr"], hide_index=True)
+        with tab_accel:
+            st.dataframe(growth_tables["acceleration"], hide_index=True)
+
+        # Same row order in every table (names can repeat at county level)
+        combined = pd.concat([growth_tables["cagr"]] +
+                             [growth_tables[k].drop(columns="Name")
+                              for k in ("acceleration", "projections")], axis=1)
+        storage.save_table(combined, "Population_Growth", out_dir)
+
+    # --------------------------------------------
+    # 8. Save cleaned output
+    # --------------------------------------------
+    output_file = storage.save_table(U, "Population_Clean", out_dir)
     st.success(f"💾 Cleaned population dataset saved to: `{output_file}`")
 
+    # --------------------------------------------
+    # 9. Snapshot history
+    # --------------------------------------------
+    key = snapshots.unique_key(U)
+    if key is None:
+        st.warning("⚠️ No unique area key (FIPS, Name + State or Name) — "
+                   "snapshot rows are matched by position.")
+    version = snapshots.commit(U, "Population", key=key)
+    st.subheader("🕓 Snapshot History")
+    st.dataframe(snapshots.versions("Population"), hide_index=True)
+
+    if version["version"] > 1:
+        try:
+            changes = snapshots.diff("Population", version["version"] - 1, version["version"])
+        except ValueError as e:
+            st.info(f"Changes since v{version['version'] - 1} not comparable: {e}")
+        else:
+            st.write(f"**Changes since v{version['version'] - 1}:** {len(changes)} rows")
+            st.dataframe(changes, hide_index=True)
+
 if __name__ == "__main__":
     main()
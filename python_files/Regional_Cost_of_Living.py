@@ -4,6 +4,8 @@ from pathlib import Path
 import os
 import streamlit as st
 
+from python_files import groupagg, prefetch, schema
+
 
 def main():
     """Regional Cost of Living Analysis — Streamlit Compatible"""
@@ -24,7 +26,7 @@ def main():
 
     # Load Excel File
     try:
-        df = pd.read_excel(in_file)
+        df = prefetch.read_excel(in_file)
         st.success("📄 File loaded successfully.")
     except Exception as e:
         st.error(f'❌ Could not read file: {e}')
@@ -33,33 +35,33 @@ def main():
     # ---------------------------------------------------
     # 2. Validate Required Columns
     # ---------------------------------------------------
-    required_cols = [
-        "Year",
-        "Average_Monthly_Income",
-        "Cost_of_Living",
-        "Housing_Cost_Percentage",
-        "Tax_Rate",
-        "Healthcare_Cost_Percentage",
-        "Education_Cost_Percentage",
-        "Transportation_Cost_Percentage"
-    ]
+    required_cols = list(schema.SCHEMAS["regional_cost_of_living"])
+    report = schema.validate(df, "regional_cost_of_living")
+
+    for col in report.missing:
+        st.error(f'❌ Required column "{col}" missing from spreadsheet.')
+    if report.missing:
+        return
 
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f'❌ Required column "{col}" missing from spreadsheet.')
-            return
+    if not report.ok:
+        st.warning("⚠️ Schema violations found in the spreadsheet:")
+        st.dataframe(report.violations[report.violations["count"] > 0])
 
     # ---------------------------------------------------
     # Clean the Year Column
     # ---------------------------------------------------
-    df = df[df["Year"] > 1900]
+    df = df[report.row_mask(["Year"])]
 
     # ---------------------------------------------------
     # 3. Aggregate Data (Mean by Year)
     # ---------------------------------------------------
     vars_to_avg = required_cols[1:]  # all except "Year"
 
-    df_avg = df.groupby("Year")[vars_to_avg].mean().reset_index()
+    # Factorize the group keys once; every breakdown below reuses the codes
+    group_keys = [c for c in ["Year", "Region", "Country"] if c in df.columns]
+    groups = groupagg.GroupIndex(df, group_keys)
+
+    df_avg = groups.mean("Year", vars_to_avg).reset_index()
 
     st.write("### 📊 Aggregated Yearly Averages")
     st.dataframe(df_avg.head())
@@ -134,6 +136,36 @@ def main():
     )
 
     # ---------------------------------------------------
-    # 6. Done
+    # 6. Breakdowns by Year / Region / Country
+    # ---------------------------------------------------
+    st.subheader("🗺️ Breakdowns")
+
+    pct_cols = [c for c in vars_to_avg if c.endswith("_Percentage")] + ["Tax_Rate"]
+    money_cols = ["Average_Monthly_Income", "Cost_of_Living"]
+
+    breakdowns = {"By Year": ["Year"]}
+    for key in group_keys[1:]:
+        breakdowns[f"By {key}"] = [key]
+        breakdowns[f"{key} × Year"] = [key, "Year"]
+
+    tabs = st.tabs(list(breakdowns))
+    for tab, keys in zip(tabs, breakdowns.values()):
+        size = groups.size(keys)
+        mean = groups.mean(keys, money_cols + pct_cols).add_suffix(" (mean)")
+        median = groups.median(keys, money_cols).add_suffix(" (median)")
+        # Percentages weighted by income: the share of all income spent on each
+        weighted = groups.weighted_mean(keys, pct_cols, "Average_Monthly_Income")
+        weighted = weighted.add_suffix(" (income-weighted)")
+        table = pd.concat([size, median, mean, weighted], axis=1)
+
+        if len(keys) > 1:
+            share = groups.share(keys, ["Average_Monthly_Income"], within="Year")
+            table["Income share of year (%)"] = share["Average_Monthly_Income"]
+
+        with tab:
+            st.dataframe(table.round(2))
+
+    # ---------------------------------------------------
+    # 7. Done
     # ---------------------------------------------------
     st.success("✅ Regional Cost of Living analysis completed successfully.")
@@ -0,0 +1,66 @@
+import pandas as pd
+import os
+import streamlit as st
+
+from python_files import geo, storage
+
+# Cleaned report -> label used to prefix clashing columns
+REPORTS = {
+    "Population_Clean":   "Population",
+    "Poverty_Clean":      "Poverty",
+    "Unemployment_Clean": "Unemployment",
+}
+
+
+def main():
+    """Join the cleaned population, poverty and unemployment reports by FIPS."""
+
+    st.header("🧩 State Panel (Population × Poverty × Unemployment)")
+    out_dir = "output"
+
+    # ---------------------------------------------------
+    # 1. Load the cleaned reports
+    # ---------------------------------------------------
+    tables = {}
+    for name, label in REPORTS.items():
+        if not os.path.exists(storage.table_path(name, out_dir)):
+            st.warning(f"⚠️ `{name}` not found yet — run its report first.")
+            continue
+        tables[label] = storage.load_table(name, out_dir)
+
+    if len(tables) < 2:
+        st.error("❌ Need at least two cleaned reports to build the panel.")
+        return
+
+    # ---------------------------------------------------
+    # 2. Resolve names to FIPS and join in one pass
+    # ---------------------------------------------------
+    panel, unresolved = geo.join_reports(tables)
+
+    for label, names in unresolved.items():
+        if names:
+            st.warning(f"⚠️ {label}: could not match {len(names)} name(s): "
+                       + ", ".join(map(str, names[:10])))
+
+    coverage = pd.DataFrame({
+        "Report": list(tables),
+        "Rows": [len(df) for df in tables.values()],
+        "Matched": [len(df) - len(unresolved[label]) for label, df in tables.items()],
+    })
+    st.write("### 🔗 Match Coverage")
+    st.dataframe(coverage, hide_index=True)
+
+    # ---------------------------------------------------
+    # 3. Save + show
+    # ---------------------------------------------------
+    output_file = storage.save_table(panel, "State_Panel", out_dir)
+
+    st.write("### 📋 Joined Panel")
+    st.dataframe(panel, hide_index=True)
+    st.success(f"💾 State panel ({len(panel)} areas) saved to: `{output_file}`")
+
+    return panel
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,30 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import glob
+import json
+import multiprocessing
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def main():
-    """Run the UnemploymentReport cleaning and analysis."""
+import streamlit as st
 
-    # Configuration
-    in_file = 'UnemploymentReport.xlsx'
-    in_sheet = 'UnemploymentReport'
-    out_dir = 'output'
+from python_files import geo, prefetch, report_utils, schema, snapshots, stats, storage
 
-    Path(out_dir).mkdir(exist_ok=True)
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
 
-    # Load raw sheet
-    raw_df = pd.read_excel(in_file, sheet_name=in_sheet, header=None)
+
+def clean_report(raw_df):
+    """Header detection and cleaning for one raw report sheet.
+
+    Returns (U, hdr_row): the cleaned Name / Unemployment_Pct table (plus
+    FIPS when the sheet has a code column) and the index of the detected
+    header row (rows above it are title rows).
+    """
     n_rows, n_cols = raw_df.shape
 
     def is_empty_cell(v):
@@ -112,89 +120,243 @@ def main():
         cols[0] = "Name"
         data.columns = cols
 
+    # Build U table
+    U = pd.DataFrame()
+    U["Name"] = data.iloc[:, name_idx].astype(str)
+    U = U[U["Name"].str.strip() != ""].copy()
+
+    # Identify unemployment %
+    lv = data.columns.str.lower()
+    remove = lv.str.contains("fips|code|id|cnt|total|number")
+    cand_idx = [i for i in range(len(data.columns)) if not remove[i] and i != name_idx]
+
+    best = {'idx': None, 'score': -float('inf'), 'scale': 1, 'hdr': ""}
+    for idx in cand_idx:
+        hdr_name = data.columns[idx]
+
+        raw_vals = data.iloc[:len(U), idx].astype(str)
+        raw_vals = raw_vals.str.replace('%', '', regex=False)
+        raw_vals = raw_vals.str.replace(',', '', regex=False)
+        vals = pd.to_numeric(raw_vals, errors='coerce')
+
+        frac = vals.notna().mean()
+        if frac < 0.75:
+            continue
+
+        col_stats = stats.RunningStats().update(vals.to_numpy(dtype=float, na_value=np.nan))
+        med = col_stats.quantile(0.50)
+        p90 = col_stats.quantile(0.90)
+        mx = col_stats.max
+        score = 0
+
+        if any(k in hdr_name.lower() for k in ["unemploy", "rate", "percent", "pct"]):
+            score += 3
+
+        if p90 <= 20 and mx <= 100:
+            score += 5
+            scale = 1
+        elif p90 <= 1.2:
+            score += 4
+            scale = 100
+        else:
+            scale = 1
+
+        if score > best["score"]:
+            best.update({'idx': idx, 'score': score, 'scale': scale, 'hdr': hdr_name})
+
+    if best["idx"] is None:
+        raise ValueError("Could not detect unemployment % column.")
+
+    # Build numeric %
+    vals = data.iloc[:len(U), best["idx"]].astype(str)
+    vals = vals.str.replace('%', '', regex=False)
+    vals = vals.str.replace(',', '', regex=False)
+    U["Unemployment_Pct"] = pd.to_numeric(vals, errors='coerce') * best["scale"]
+
+    fips = geo.fips_column(data)
+    if fips is not None:
+        U["FIPS"] = fips
+
+    # Final cleaning
+    U, _ = geo.drop_aggregate_rows(U, fips_col="FIPS")
+    U = U.copy()
+    U = U[schema.validate(U, "unemployment").row_mask(["Unemployment_Pct"])]
+
+    return U, hdr_row
+
+
+def main():
+    """Run the UnemploymentReport cleaning and analysis."""
+
+    # Configuration
+    in_file = 'UnemploymentReport.xlsx'
+    in_sheet = 'UnemploymentReport'
+    out_dir = 'output'
+
+    Path(out_dir).mkdir(exist_ok=True)
+
+    # Load raw sheet
+    raw_df = prefetch.read_excel(in_file, sheet_name=in_sheet, header=None)
+    U, _ = clean_report(raw_df)
+    level = geo.dominant_level(geo.detect_level(U["Name"]))
+
+    # Save cleaned table (Feather + Parquet + CSV)
+    storage.save_table(U, "Unemployment_Clean", out_dir)
+    snapshots.commit(U, "Unemployment", key=snapshots.unique_key(U))
+
+    # Plot histogram
+    plt.figure(figsize=(9, 5))
+    report_utils.plot_histogram(plt.gca(), U["Unemployment_Pct"], bins=15)
+    plt.xlabel("Unemployment Rate (%)")
+    plt.ylabel(geo.level_label(level))
+    plt.title("Distribution of Unemployment Rates")
+    hist_path = os.path.join(out_dir, "unemployment_hist.png")
+    plt.savefig(hist_path)
+    plt.close()
+
+    # Plot top 10
+    top10 = report_utils.top_k(U, "Unemployment_Pct", 10)
+    plt.figure(figsize=(9, 6))
+    plt.barh(top10["Name"], top10["Unemployment_Pct"])
+    plt.xlabel("Unemployment Rate (%)")
+    plt.title("Top 10 Highest Unemployment")
+    bar_path = os.path.join(out_dir, "unemployment_top10.png")
+    plt.savefig(bar_path)
+    plt.close()
+
+    st.subheader("📋 Cleaned Unemployment Table")
+    st.dataframe(U, hide_index=True)
+    col1, col2 = st.columns(2)
+    col1.image(hist_path)
+    col2.image(bar_path)
+
+    return U, hist_path, bar_path
+
+
+# =========================================================
+# Multi-file ingestion -> (geography x period) panel
+# =========================================================
+def extract_period(path, title_rows=None):
+    """Reporting period of a report, from its file name or its title rows.
+
+    Recognises 2024-03 / 2024_03 / 202403, "March 2024" / "Mar-2024" and a
+    bare year. Returns a pandas Period (monthly or annual), or None.
+    """
+    texts = [Path(path).stem]
+    if title_rows is not None and len(title_rows):
+        texts.append(" ".join(title_rows.fillna("").astype(str).to_numpy().ravel()))
+
+    for text in texts:
+        t = text.lower()
+        m = re.search(r"((?:19|20)\d{2})[-_ .]?(0[1-9]|1[0-2])(?!\d)", t)
+        if m:
+            return pd.Period(year=int(m.group(1)), month=int(m.group(2)), freq="M")
+        m = re.search(r"\b(" + "|".join(MONTHS) + r")[a-z]*[-_ .,]*((?:19|20)\d{2})", t)
+        if m:
+            return pd.Period(year=int(m.group(2)), month=MONTHS[m.group(1)], freq="M")
+        m = re.search(r"(?<!\d)((?:19|20)\d{2})(?!\d)", t)
+        if m:
+            return pd.Period(year=int(m.group(1)), freq="Y")
+    return None
+
+
+def _ingest_file(path):
+    # Runs in a worker process: read, detect header, clean, tag the period.
+    raw_df = pd.read_excel(path, sheet_name=0, header=None)
+    U, hdr_row = clean_report(raw_df)
+    period = extract_period(path, raw_df.iloc[:hdr_row])
+    if period is None:
+        raise ValueError(f"Could not determine the reporting period of {path}.")
+    # Same key as the manifest, so a re-ingested file's old rows can be found
+    return U.assign(Period=str(period), Source=os.path.abspath(path))
+
+
+def _file_signature(path):
+    st_ = os.stat(path)
+    return {"mtime": st_.st_mtime, "size": st_.st_size}
+
+
+def ingest_panel(source, out_dir="output", name="Unemployment_Panel", max_workers=None):
+    """Build a long (Name, [FIPS,] Period, Unemployment_Pct) panel from many reports.
+
+    ``source`` is a directory (all .xlsx inside it) or a glob pattern. Files
+    are cleaned in a process pool. A manifest of already-ingested files
+    (path, mtime, size) is kept next to the panel, so re-running only
+    processes new or modified workbooks. Returns the panel DataFrame.
+    """
+    pattern = os.path.join(source, "*.xlsx") if os.path.isdir(source) else source
+    paths = sorted(p for p in glob.glob(pattern) if not os.path.basename(p).startswith("~$"))
+
+    manifest_path = os.path.join(out_dir, f"{name}.ingested.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    todo = [p for p in paths if manifest.get(os.path.abspath(p)) != _file_signature(p)]
+
+    panel = None
+    if os.path.exists(storage.table_path(name, out_dir)):
+        panel = storage.load_table(name, out_dir)
+
+    if not todo:
+        return panel
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+        new_parts = list(pool.map(_ingest_file, todo))
+
+    # Replace rows from re-ingested (modified) files, keep everything else
+    parts = new_parts
+    if panel is not None:
+        redone = {os.path.abspath(p) for p in todo}
+        parts = [panel[~panel["Source"].isin(redone)]] + new_parts
+
+    panel = pd.concat(parts, ignore_index=True)
+    repeated = pd.DataFrame({"area": area_ids(panel), "period": panel["Period"]}).duplicated(keep="last")
+    panel = (
+        panel[~repeated.to_numpy()]
+        .sort_values(["Name", "Period"], kind="stable")
+        .reset_index(drop=True)
+    )
+    panel["Name"] = panel["Name"].astype("category")
+    storage.save_table(panel, name, out_dir)
+
+    for p in todo:
+        manifest[os.path.abspath(p)] = _file_signature(p)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return panel
+
+
+def area_ids(panel):
+    """Geography key per row: the FIPS code, or the name for reports without one.
+
+    County names repeat across states ("Washington County"), so rows are only
+    matched by name when there is no code to match them by.
+    """
+    names = panel["Name"].astype(str)
+    if "FIPS" not in panel.columns:
+        return names.rename("Area")
+    return panel["FIPS"].astype("string").fillna(names).rename("Area")
+
+
+def panel_wide(panel):
+    """Pivot the long panel to one row per area and one column per period.
+
+    Rows are keyed by area_ids(); the area's name is kept as a column.
+    """
+    panel = panel.assign(Area=area_ids(panel).to_numpy())
+    wide = panel.pivot(index="Area", columns="Period", values="Unemployment_Pct")
+    names = panel.drop_duplicates("Area", keep="last").set_index("Area")["Name"]
+    wide.insert(0, "Name", names.reindex(wide.index).astype(str))
+    return wide
+
 
-        # Build U table
-        U = pd.DataFrame()
-        U["Name"] = data.iloc[:, name_idx].astype(str)
-        U = U[U["Name"].str.strip() != ""].copy()
-
-        # Identify unemployment %
-        lv = data.columns.str.lower()
-        remove = lv.str.contains("fips|code|id|cnt|total|number")
-        cand_idx = [i for i in range(len(data.columns)) if not remove[i] and i != name_idx]
-
-        best = {'idx': None, 'score': -float('inf'), 'scale': 1, 'hdr': ""}
-        for idx in cand_idx:
-            hdr_name = data.columns[idx]
-
-            raw_vals = data.iloc[:len(U), idx].astype(str)
-            raw_vals = raw_vals.str.replace('%', '', regex=False)
-            raw_vals = raw_vals.str.replace(',', '', regex=False)
-            vals = pd.to_numeric(raw_vals, errors='coerce')
-
-            frac = vals.notna().mean()
-            if frac < 0.75:
-                continue
-
-            med = vals.median()
-            p90 = vals.quantile(0.90)
-            mx = vals.max()
-            score = 0
-
-            if any(k in hdr_name.lower() for k in ["unemploy", "rate", "percent", "pct"]):
-                score += 3
-
-            if p90 <= 20 and mx <= 100:
-                score += 5
-                scale = 1
-            elif p90 <= 1.2:
-                score += 4
-                scale = 100
-            else:
-                scale = 1
-
-            if score > best["score"]:
-                best.update({'idx': idx, 'score': score, 'scale': scale, 'hdr': hdr_name})
-
-        if best["idx"] is None:
-            raise ValueError("Could not detect unemployment % column.")
-
-        # Build numeric %
-        vals = data.iloc[:len(U), best["idx"]].astype(str)
-        vals = vals.str.replace('%', '', regex=False)
-        vals = vals.str.replace(',', '', regex=False)
-        U["Unemployment_Pct"] = pd.to_numeric(vals, errors='coerce') * best["scale"]
-
-        # Final cleaning
-        U = U[~U["Name"].str.lower().eq("united states")].copy()
-        U = U[~U["Name"].str.match(r'^\d+$', na=False)].copy()
-        U = U[(U["Unemployment_Pct"] >= 0) & (U["Unemployment_Pct"] <= 100)]
-
-        # Save cleaned CSV
-        out_csv = os.path.join(out_dir, "Unemployment_Clean.csv")
-        U.to_csv(out_csv, index=False)
-
-        # Plot histogram
-        plt.figure(figsize=(9, 5))
-        plt.hist(U["Unemployment_Pct"], bins=15)
-        plt.xlabel("Unemployment Rate (%)")
-        plt.ylabel("Count")
-        plt.title("Distribution of Unemployment Rates")
-        hist_path = os.path.join(out_dir, "unemployment_hist.png")
-        plt.savefig(hist_path)
-        plt.close()
-
-        # Plot top 10
-        top10 = U.nlargest(10, "Unemployment_Pct")
-        plt.figure(figsize=(9, 6))
-        plt.barh(top10["Name"], top10["Unemployment_Pct"])
-        plt.xlabel("Unemployment Rate (%)")
-        plt.title("Top 10 Highest Unemployment")
-        bar_path = os.path.join(out_dir, "unemployment_top10.png")
-        plt.savefig(bar_path)
-        plt.close()
-    
-        return U, hist_path, bar_path
-    
 if __name__ == "__main__":
-    main()
+    # python -m python_files.Unemployment "reports/*.xlsx"  -> panel mode
+    if len(sys.argv) > 1:
+        print(panel_wide(ingest_panel(sys.argv[1])))
+    else:
+        main()
@@ -0,0 +1,290 @@
+"""Outlier and anomaly flags for the housing listings.
+
+RobustDetector learns robust statistics for each group of listings
+(bedrooms x furnishing status by default): the median, the MAD (median
+absolute deviation) and the quartiles of price, area and price per area.
+flag() then checks every row against its own group with vectorised rules:
+- ``invalid``: price or area missing, zero or negative
+- ``mad_<col>``: robust z-score 0.6745 * |x - median| / MAD above 3.5
+- ``iqr_<col>``: outside the Tukey fences Q1 - 1.5 IQR / Q3 + 1.5 IQR
+- ``isolation_forest`` (optional): multivariate IsolationForest outliers
+
+Groups with too few rows to be trusted use the pooled statistics.
+
+fit() computes exact statistics on an in-memory frame with groupagg.
+fit_chunks() streams a feed that does not fit in memory. It makes two
+passes over the chunks with one KLL sketch per group and column: the first
+pass gives the medians and quartiles, the second the MADs. scan() then flags
+(and optionally drops) chunk by chunk.
+"""
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from python_files import groupagg
+from python_files.stats import KLLSketch
+
+GROUP_KEYS = ["bedrooms", "furnishingstatus"]
+VALUE_COLS = ["price", "area", "price_per_area"]
+MAD_THRESHOLD = 3.5
+IQR_K = 1.5
+MIN_GROUP_SIZE = 10
+IFOREST_SAMPLE = 100_000
+SCORE_CHUNK = 250_000
+DROP_RULES = ("invalid", "mad_")
+
+
+def _with_ratio(df):
+    """Numeric price/area plus price per area (NaN unless both are positive)."""
+    price = pd.to_numeric(df["price"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    area = pd.to_numeric(df["area"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    ok = (price > 0) & (area > 0)
+    ratio = np.full(len(df), np.nan)
+    ratio[ok] = price[ok] / area[ok]
+    return price, area, ratio
+
+
+def _values(df, columns):
+    price, area, ratio = _with_ratio(df)
+    derived = {"price": price, "area": area, "price_per_area": ratio}
+    return {c: derived[c] if c in derived else
+            pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            for c in columns}
+
+
+class RobustDetector:
+    """Per-group median/MAD and IQR outlier rules, optionally an IsolationForest."""
+
+    def __init__(self, keys=GROUP_KEYS, columns=VALUE_COLS, mad_threshold=MAD_THRESHOLD,
+                 iqr_k=IQR_K, min_group_size=MIN_GROUP_SIZE, isolation_forest=False,
+                 contamination="auto", n_jobs=-1, random_state=0):
+        self.keys = list(keys)
+        self.columns = list(columns)
+        self.mad_threshold = mad_threshold
+        self.iqr_k = iqr_k
+        self.min_group_size = min_group_size
+        self.isolation_forest = isolation_forest
+        self.contamination = contamination
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.stats = None      # one row per group, columns (value column, stat)
+        self.pooled = None     # the same statistics over every row
+        self.forest = None
+
+    # ---------------------------------------------------------
+    # Fit: exact, in memory
+    # ---------------------------------------------------------
+    def fit(self, df):
+        work = pd.DataFrame(_values(df, self.columns), index=df.index)
+        for k in self.keys:
+            work[k] = df[k].to_numpy()
+        work["_all"] = 0
+        groups = groupagg.GroupIndex(work, self.keys + ["_all"])
+        groupings = {"group": self.keys, "all": ["_all"]}
+
+        medians = {g: groups.median(keys, self.columns) for g, keys in groupings.items()}
+        # Absolute deviations from each row's own median, as extra columns
+        for g, keys in groupings.items():
+            codes, _, _ = groups.grouping(keys)
+            for c in self.columns:
+                med = np.append(medians[g][c].to_numpy(), np.nan)[codes]
+                work[f"_dev_{g}_{c}"] = np.abs(work[c].to_numpy() - med)
+
+        def table(g):
+            keys = groupings[g]
+            codes, n, _ = groups.grouping(keys)
+            mad = groups.median(keys, [f"_dev_{g}_{c}" for c in self.columns])
+            q1 = groups.quantile(keys, self.columns, 0.25)
+            q3 = groups.quantile(keys, self.columns, 0.75)
+            out = {}
+            for c in self.columns:
+                ok = (codes >= 0) & ~np.isnan(work[c].to_numpy())
+                out[c] = pd.DataFrame({"count": np.bincount(codes[ok], minlength=n),
+                                       "median": medians[g][c], "mad": mad[f"_dev_{g}_{c}"],
+                                       "q1": q1[c], "q3": q3[c]}, index=q1.index)
+            return pd.concat(out, axis=1)
+
+        self.stats = table("group")
+        self.pooled = table("all").iloc[0]
+        if self.isolation_forest:
+            self._fit_forest(df)
+        return self
+
+    # ---------------------------------------------------------
+    # Fit: streamed in chunks
+    # ---------------------------------------------------------
+    def fit_chunks(self, chunks, k=400):
+        """Fit from a re-iterable source of DataFrame chunks.
+
+        ``chunks`` is a callable returning a fresh iterator of chunks; it is
+        called twice. Quantiles come from KLL sketches, so they are
+        approximate once a group outgrows the sketch.
+        """
+        def sketches(values_of):
+            groups, pooled = {}, {c: KLLSketch(k, seed=0) for c in self.columns}
+            for chunk in chunks():
+                values = values_of(chunk)
+                for key, rows in chunk.groupby(self.keys, sort=False, observed=True).indices.items():
+                    key = key if isinstance(key, tuple) else (key,)
+                    acc = groups.setdefault(key, {c: KLLSketch(k, seed=0) for c in self.columns})
+                    for c in self.columns:
+                        acc[c].update(values[c][rows])
+                for c in self.columns:
+                    pooled[c].update(values[c])
+            return groups, pooled
+
+        # Pass 1: medians and quartiles (and the IsolationForest sample)
+        samples = []
+
+        def first(chunk):
+            if self.isolation_forest:
+                n = min(len(chunk), IFOREST_SAMPLE)
+                samples.append(chunk.sample(n, random_state=self.random_state))
+            return _values(chunk, self.columns)
+
+        groups, pooled = sketches(first)
+        if len(self.keys) == 1:
+            index = pd.Index([g[0] for g in groups], name=self.keys[0])
+        else:
+            index = pd.MultiIndex.from_tuples(list(groups), names=self.keys)
+        level = pd.DataFrame([{c: s[c].median() for c in self.columns} for s in groups.values()],
+                             index=index)
+        pooled_level = pd.Series({c: pooled[c].median() for c in self.columns})
+
+        # Pass 2: absolute deviations from each group's median
+        def second(chunk):
+            values = _values(chunk, self.columns)
+            medians = self._lookup(chunk, level, pooled_level)
+            return {c: np.abs(values[c] - medians[c]) for c in self.columns}
+
+        dev_groups, dev_pooled = sketches(second)
+
+        def row(s, dev):
+            return {(c, stat): value for c in self.columns for stat, value in (
+                ("count", s[c].n), ("median", s[c].median()), ("mad", dev[c].median()),
+                ("q1", s[c].quantile(0.25)), ("q3", s[c].quantile(0.75)))}
+
+        self.stats = pd.DataFrame([row(groups[g], dev_groups[g]) for g in groups], index=index)
+        self.stats.columns = pd.MultiIndex.from_tuples(self.stats.columns)
+        self.stats = self.stats.sort_index()
+        self.pooled = pd.Series(row(pooled, dev_pooled))
+
+        if self.isolation_forest and samples:
+            sample = pd.concat(samples, ignore_index=True)
+            if len(sample) > IFOREST_SAMPLE:
+                sample = sample.sample(IFOREST_SAMPLE, random_state=self.random_state)
+            self._fit_forest(sample)
+        return self
+
+    # ---------------------------------------------------------
+    # Flag
+    # ---------------------------------------------------------
+    def _lookup(self, df, table, fallback):
+        """``table`` row of each row's group (``fallback`` for unknown groups)."""
+        if len(self.keys) == 1:
+            keys = pd.Index(df[self.keys[0]])
+        else:
+            keys = pd.MultiIndex.from_frame(df[self.keys])
+        pos = table.index.get_indexer(keys)
+        out = {}
+        for col in table.columns:
+            values = np.append(table[col].to_numpy(dtype=float), fallback[col])
+            out[col] = values[np.where(pos < 0, len(table), pos)]
+        return out
+
+    def group_stats(self, df):
+        """Statistics applied to each row: its group's, or the pooled ones."""
+        table = self.stats.copy()
+        small = np.zeros(len(table), dtype=bool)
+        for c in self.columns:
+            small |= table[(c, "count")].to_numpy() < self.min_group_size
+        table.loc[small] = np.asarray(self.pooled[table.columns], dtype=float)
+        return self._lookup(df, table, self.pooled)
+
+    def flag(self, df):
+        """One boolean column per rule plus ``any``, aligned with ``df``."""
+        if self.stats is None:
+            raise ValueError("RobustDetector has not been fitted")
+        values = _values(df, self.columns)
+        applied = self.group_stats(df)
+        price, area, _ = _with_ratio(df)
+        flags = {}
+        flags["invalid"] = ~((price > 0) & (area > 0))
+
+        for c in self.columns:
+            x = values[c]
+            median, mad = applied[(c, "median")], applied[(c, "mad")]
+            q1, q3 = applied[(c, "q1")], applied[(c, "q3")]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = 0.6745 * np.abs(x - median) / mad
+            flags[f"mad_{c}"] = np.nan_to_num(z, nan=0, posinf=0) > self.mad_threshold
+            spread = self.iqr_k * (q3 - q1)
+            flags[f"iqr_{c}"] = (x < q1 - spread) | (x > q3 + spread)
+
+        if self.forest is not None:
+            flags["isolation_forest"] = self._forest_outliers(df)
+
+        out = pd.DataFrame(flags, index=df.index)
+        out["any"] = out.any(axis=1)
+        return out
+
+    def to_drop(self, flags, rules=DROP_RULES):
+        """Rows flagged by any rule whose name starts with one of ``rules``."""
+        cols = [c for c in flags.columns if c != "any" and c.startswith(tuple(rules))]
+        return flags[cols].any(axis=1)
+
+    # ---------------------------------------------------------
+    # Isolation forest
+    # ---------------------------------------------------------
+    def _forest_matrix(self, df):
+        values = _values(df, self.columns)
+        X = np.column_stack([values[c] for c in self.columns])
+        # Missing values sit at the pooled median; invalid rows are flagged anyway
+        medians = np.array([self.pooled[(c, "median")] for c in self.columns])
+        return np.where(np.isnan(X), medians, X)
+
+    def _fit_forest(self, df):
+        X = self._forest_matrix(df)
+        if len(X) > IFOREST_SAMPLE:
+            rng = np.random.default_rng(self.random_state)
+            X = X[rng.choice(len(X), IFOREST_SAMPLE, replace=False)]
+        self.forest = IsolationForest(contamination=self.contamination, n_jobs=self.n_jobs,
+                                      random_state=self.random_state).fit(X)
+
+    def _forest_outliers(self, df):
+        X = self._forest_matrix(df)
+        # Score fixed-size slices in parallel threads (the trees release the GIL)
+        slices = [slice(i, i + SCORE_CHUNK) for i in range(0, len(X), SCORE_CHUNK)]
+        parts = joblib.Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            joblib.delayed(self.forest.predict)(X[s]) for s in slices)
+        return np.concatenate(parts) < 0 if parts else np.zeros(0, dtype=bool)
+
+
+# ---------------------------------------------------------
+# Streaming and reporting
+# ---------------------------------------------------------
+def scan(chunks, detector, drop=DROP_RULES):
+    """Yield (kept rows, flags) for each chunk of ``chunks``.
+
+    With ``drop=None`` every row is kept and only flagged.
+    """
+    for chunk in chunks:
+        flags = detector.flag(chunk)
+        if drop is None:
+            yield chunk, flags
+        else:
+            yield chunk[~detector.to_drop(flags, drop).to_numpy()], flags
+
+
+def rule_counts(flags, drop=DROP_RULES):
+    """Flagged rows per rule (a frame of flags or a list of them)."""
+    if isinstance(flags, pd.DataFrame):
+        flags = [flags]
+    counts = pd.concat([f.sum() for f in flags], axis=1).sum(axis=1)
+    rows = sum(len(f) for f in flags)
+    table = pd.DataFrame({"Rule": counts.index, "Flagged": counts.to_numpy(dtype=int)})
+    table["Share (%)"] = table["Flagged"] / max(rows, 1) * 100
+    table["Removed"] = [drop is not None and r != "any" and r.startswith(tuple(drop))
+                        for r in table["Rule"]]
+    return table
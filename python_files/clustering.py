@@ -0,0 +1,101 @@
+"""Cluster areas by their housing-stress profile.
+
+build_features() turns the joined state/county panel into one standardised
+row per area: population growth per period (log ratios of Pop_1990 ...
+Pop_2023), the recent change, the poverty rates and unemployment. sweep()
+fits MiniBatchKMeans for every k in parallel (joblib threads; the k-means
+kernels release the GIL) and scores each fit by silhouette on a bounded
+sample, so it scales to tract-level rows. Sweeps are cached on disk under
+a hash of the feature matrix and parameters, so an unchanged panel is never
+refitted.
+"""
+import hashlib
+import os
+import re
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from python_files import groupagg, storage
+
+CACHE_DIR = os.path.join(storage.OUT_DIR, ".cache", "clustering")
+FEATURES = ["Change_2020_23", "All_Poverty_Pct", "Children_Poverty_Pct", "Unemployment_Pct"]
+SILHOUETTE_SAMPLE = 5_000
+
+
+def build_features(panel):
+    """(feature frame, standardised matrix) for the rows with any feature.
+
+    Missing values are filled with the column median before scaling.
+    """
+    pop_cols = sorted((c for c in panel.columns if re.fullmatch(r"Pop_\d{4}", c)),
+                      key=lambda c: int(c[4:]))
+    feats = {}
+    for a, b in zip(pop_cols, pop_cols[1:]):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = panel[b].to_numpy(dtype=float) / panel[a].to_numpy(dtype=float)
+            feats[f"Growth_{a[4:]}_{b[4:]}"] = np.log(ratio)
+    for c in FEATURES:
+        if c in panel.columns:
+            feats[c] = panel[c].to_numpy(dtype=float)
+
+    frame = pd.DataFrame(feats, index=panel.index).replace([np.inf, -np.inf], np.nan)
+    frame = frame.loc[frame.notna().any(axis=1), frame.notna().any(axis=0)]
+    filled = frame.fillna(frame.median())
+
+    std = filled.std(ddof=0).replace(0, 1)
+    X = ((filled - filled.mean()) / std).to_numpy()
+    return frame, X
+
+
+def _fit(X, k, random_state):
+    model = MiniBatchKMeans(n_clusters=k, batch_size=1024, n_init=3,
+                            random_state=random_state)
+    labels = model.fit_predict(X)
+    sample = min(len(X), SILHOUETTE_SAMPLE)
+    score = (silhouette_score(X, labels, sample_size=sample, random_state=random_state)
+             if len(set(labels)) > 1 else np.nan)
+    return {"k": k, "labels": labels, "centers": model.cluster_centers_,
+            "inertia": float(model.inertia_), "silhouette": float(score)}
+
+
+def _hash(X, ks, random_state):
+    h = hashlib.sha256(np.ascontiguousarray(X).tobytes())
+    h.update(repr((X.shape, list(ks), random_state)).encode())
+    return h.hexdigest()[:20]
+
+
+def sweep(X, ks=range(2, 9), random_state=0, n_jobs=-1, cache_dir=CACHE_DIR):
+    """Fit every k in ``ks`` in parallel; returns the list of fits.
+
+    Each fit is a dict with k, labels, centers, inertia and silhouette.
+    """
+    ks = [k for k in ks if 1 < k < len(X)]
+    path = os.path.join(cache_dir, f"{_hash(X, ks, random_state)}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    fits = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+        joblib.delayed(_fit)(X, k, random_state) for k in ks)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(fits, path)
+    return fits
+
+
+def best_fit(fits):
+    """The fit with the highest silhouette score."""
+    return max(fits, key=lambda f: -np.inf if np.isnan(f["silhouette"]) else f["silhouette"])
+
+
+def profiles(frame, labels, columns=None):
+    """Per-cluster size plus mean and median of each feature."""
+    df = frame.assign(Cluster=labels)
+    columns = list(frame.columns) if columns is None else columns
+    groups = groupagg.GroupIndex(df, ["Cluster"])
+    return pd.concat([groups.size("Cluster"),
+                      groups.mean("Cluster", columns).add_suffix(" (mean)"),
+                      groups.median("Cluster", columns).add_suffix(" (median)")], axis=1)
@@ -0,0 +1,175 @@
+"""Duplicate listings: 64-bit row fingerprints over normalised key columns.
+
+Each row is reduced to one uint64 with pd.util.hash_pandas_object over its
+key columns after normalisation (numbers as floats, text trimmed and
+lower-cased), so relisted or syndicated copies of a property hash the same.
+Exact duplicates are then found with one hash-table pass, O(n).
+
+Near-duplicate mode also matches copies whose price and area differ by a
+small relative tolerance. Both are put on a log-scale grid of buckets that
+wide, and each row is hashed once per combination of that grid and the grid
+shifted by half a bucket (four hashes for price and area). Two rows within
+half the tolerance on every column always share at least one of them.
+
+FingerprintStore keeps the fingerprints of everything seen so far as one
+sorted .npy file. It is memory-mapped and probed with np.searchsorted, so a
+new feed is checked against the history without loading it into memory.
+"""
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from python_files import storage
+
+KEY_COLS = ["price", "area", "bedrooms", "bathrooms", "stories", "parking",
+            "mainroad", "guestroom", "basement", "hotwaterheating",
+            "airconditioning", "prefarea", "furnishingstatus"]
+TOLERANCE_COLS = ["price", "area"]
+NEAR_TOLERANCE = 0.02
+STORE_DIR = os.path.join(storage.OUT_DIR, ".dedup")
+
+
+def normalize(df, columns=KEY_COLS):
+    """Key columns as floats (numbers) or hashes of trimmed lower-case text.
+
+    Text columns are factorized first, so only their distinct values are
+    normalised and hashed; every row then just looks its hash up.
+    """
+    out = {}
+    for c in columns:
+        s = df[c]
+        if pd.api.types.is_numeric_dtype(s):
+            out[c] = s.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            codes, uniques = pd.factorize(s, use_na_sentinel=False)
+            text = pd.Series(uniques, dtype="string").str.strip().str.lower()
+            out[c] = pd.util.hash_array(text.to_numpy(dtype=object, na_value=None))[codes]
+    return pd.DataFrame(out, index=df.index)
+
+
+def _hash(frame):
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def fingerprints(df, columns=KEY_COLS, tolerance=None, tolerance_cols=TOLERANCE_COLS):
+    """uint64 fingerprint(s) per row.
+
+    Exact mode returns one array. With a ``tolerance`` (relative, e.g. 0.02)
+    it returns one array per combination of unshifted / half-shifted grids
+    over the tolerance columns.
+    """
+    frame = normalize(df, columns)
+    if tolerance is None:
+        return _hash(frame)
+
+    step = np.log1p(tolerance)
+    cols = [c for c in tolerance_cols if c in frame.columns]
+    scaled = {}
+    for c in cols:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scaled[c] = np.log(np.where(frame[c] > 0, frame[c], np.nan)) / step
+
+    out = []
+    for shifts in itertools.product((0.0, 0.5), repeat=len(cols)):
+        grid = frame.copy()
+        for c, shift in zip(cols, shifts):
+            grid[c] = np.floor(scaled[c] + shift)
+        out.append(_hash(grid))
+    return out
+
+
+def _repeated(fp):
+    """True for every occurrence of a fingerprint after its first (hash table)."""
+    return pd.Index(fp).duplicated(keep="first")
+
+
+def duplicated(df, columns=KEY_COLS, tolerance=None):
+    """Boolean mask of rows that repeat an earlier row (within ``tolerance``)."""
+    fps = fingerprints(df, columns, tolerance)
+    if tolerance is None:
+        return _repeated(fps)
+    mask = np.zeros(len(df), dtype=bool)
+    for fp in fps:
+        mask |= _repeated(fp)
+    return mask
+
+
+# ---------------------------------------------------------
+# Persistent fingerprint history
+# ---------------------------------------------------------
+class FingerprintStore:
+    """Sorted, memory-mapped set of the fingerprints seen in earlier feeds."""
+
+    def __init__(self, name, root=STORE_DIR):
+        self.path = os.path.join(root, f"{name}.npy")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=np.uint64)
+        return np.load(self.path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self._load())
+
+    def contains(self, fp):
+        """Mask of the fingerprints already in the store."""
+        fp = np.asarray(fp, dtype=np.uint64)
+        seen = self._load()
+        if len(seen) == 0:
+            return np.zeros(len(fp), dtype=bool)
+        pos = np.searchsorted(seen, fp)
+        return seen[np.minimum(pos, len(seen) - 1)] == fp
+
+    def add(self, fp):
+        """Merge new fingerprints into the store; returns how many were new."""
+        fp = np.unique(np.asarray(fp, dtype=np.uint64))
+        seen = self._load()
+        new = fp[~self.contains(fp)]
+        if len(new) == 0:
+            return 0
+        # Sorted insert of the (small) batch into the (large) history
+        merged = np.insert(np.asarray(seen), np.searchsorted(seen, new), new)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp.npy"
+        np.save(tmp, merged)
+        os.replace(tmp, self.path)
+        return len(new)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ---------------------------------------------------------
+# Dedup stage
+# ---------------------------------------------------------
+def dedupe(df, columns=KEY_COLS, mode="exact", tolerance=NEAR_TOLERANCE, history=None,
+           drop_seen=False):
+    """Drop duplicate rows of ``df``; returns (kept rows, report dict).
+
+    ``mode`` is "exact" or "near". With a ``history`` store, kept rows whose
+    exact fingerprint is already stored are counted as ``seen_before`` (and
+    dropped too with ``drop_seen``), and the new fingerprints are added.
+    """
+    if mode not in ("exact", "near"):
+        raise ValueError(f"Unknown dedup mode: {mode}")
+    exact = fingerprints(df, columns)
+    drop = _repeated(exact)
+    report = {"rows": len(df), "exact_duplicates": int(drop.sum())}
+
+    if mode == "near":
+        near = duplicated(df, columns, tolerance) & ~drop
+        report["near_duplicates"] = int(near.sum())
+        drop |= near
+
+    if history is not None:
+        seen = history.contains(exact) & ~drop
+        report["seen_before"] = int(seen.sum())
+        if drop_seen:
+            drop |= seen
+        report["added_to_history"] = history.add(exact[~drop])
+
+    report["kept"] = int((~drop).sum())
+    return df[~drop], report
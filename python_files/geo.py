@@ -0,0 +1,489 @@
+"""Geographic level detection for the state/county/tract report extracts.
+
+The SAIPE, LAUS and Census extracts mix the areas we want (states, counties
+or tracts) with aggregate rows such as "United States", census regions or,
+in county files, the state subtotal rows. detect_level() classifies every
+row in one vectorised pass over the names (and FIPS codes when present), and
+drop_aggregate_rows() keeps only the finest level found in the table.
+
+GeoIndex is the geography dimension itself: it is keyed by FIPS code, knows
+each row's parent at every coarser level (tract -> county -> state -> region
+-> nation) and computes count-summed or population-weighted roll-ups with one
+np.bincount per level, caching them so the dashboard can switch levels
+without re-reading or re-aggregating the source sheets. rollup_tables()
+keeps every level's table on disk under a hash of its inputs, so a report
+that hasn't changed doesn't rebuild the index on the next run.
+
+NameResolver maps free-text area names ("alabama", "AL", "Autauga County,
+Alabama", "Texas 2/", ...) to FIPS codes: names are normalised, looked up in a
+hash index of known spellings, and only unknown spellings fall back to a
+fuzzy difflib match. Lookups are memoised, so a report with thousands of
+repeated names resolves each distinct name once. join_reports() uses it to
+put the state/county reports side by side on one FIPS index.
+"""
+import difflib
+import hashlib
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from python_files import storage
+
+# (FIPS, postal abbreviation, name, census region)
+STATES = [
+    ("01", "AL", "Alabama", "South"),
+    ("02", "AK", "Alaska", "West"),
+    ("04", "AZ", "Arizona", "West"),
+    ("05", "AR", "Arkansas", "South"),
+    ("06", "CA", "California", "West"),
+    ("08", "CO", "Colorado", "West"),
+    ("09", "CT", "Connecticut", "Northeast"),
+    ("10", "DE", "Delaware", "South"),
+    ("11", "DC", "District of Columbia", "South"),
+    ("12", "FL", "Florida", "South"),
+    ("13", "GA", "Georgia", "South"),
+    ("15", "HI", "Hawaii", "West"),
+    ("16", "ID", "Idaho", "West"),
+    ("17", "IL", "Illinois", "Midwest"),
+    ("18", "IN", "Indiana", "Midwest"),
+    ("19", "IA", "Iowa", "Midwest"),
+    ("20", "KS", "Kansas", "Midwest"),
+    ("21", "KY", "Kentucky", "South"),
+    ("22", "LA", "Louisiana", "South"),
+    ("23", "ME", "Maine", "Northeast"),
+    ("24", "MD", "Maryland", "South"),
+    ("25", "MA", "Massachusetts", "Northeast"),
+    ("26", "MI", "Michigan", "Midwest"),
+    ("27", "MN", "Minnesota", "Midwest"),
+    ("28", "MS", "Mississippi", "South"),
+    ("29", "MO", "Missouri", "Midwest"),
+    ("30", "MT", "Montana", "West"),
+    ("31", "NE", "Nebraska", "Midwest"),
+    ("32", "NV", "Nevada", "West"),
+    ("33", "NH", "New Hampshire", "Northeast"),
+    ("34", "NJ", "New Jersey", "Northeast"),
+    ("35", "NM", "New Mexico", "West"),
+    ("36", "NY", "New York", "Northeast"),
+    ("37", "NC", "North Carolina", "South"),
+    ("38", "ND", "North Dakota", "Midwest"),
+    ("39", "OH", "Ohio", "Midwest"),
+    ("40", "OK", "Oklahoma", "South"),
+    ("41", "OR", "Oregon", "West"),
+    ("42", "PA", "Pennsylvania", "Northeast"),
+    ("44", "RI", "Rhode Island", "Northeast"),
+    ("45", "SC", "South Carolina", "South"),
+    ("46", "SD", "South Dakota", "Midwest"),
+    ("47", "TN", "Tennessee", "South"),
+    ("48", "TX", "Texas", "South"),
+    ("49", "UT", "Utah", "West"),
+    ("50", "VT", "Vermont", "Northeast"),
+    ("51", "VA", "Virginia", "South"),
+    ("53", "WA", "Washington", "West"),
+    ("54", "WV", "West Virginia", "South"),
+    ("55", "WI", "Wisconsin", "Midwest"),
+    ("56", "WY", "Wyoming", "West"),
+    ("72", "PR", "Puerto Rico", None),
+]
+
+REGIONS = ["Northeast", "Midwest", "South", "West"]
+
+# Coarse -> fine; a table is reported at the finest level it contains.
+LEVELS = ["nation", "region", "state", "county", "tract"]
+LEVEL_LABELS = {
+    "nation": "Nation", "region": "Regions", "state": "States",
+    "county": "Counties", "tract": "Tracts",
+}
+
+_STATE_NAMES = {name.lower() for _, _, name, _ in STATES}
+_REGION_NAMES = {r.lower() for r in REGIONS} | {f"{r.lower()} region" for r in REGIONS}
+_COUNTY_PATTERN = (
+    r"(?:county|parish|borough|census area|municipality|municipio|city and borough"
+    r"|\bcity)(?:,|$)"
+)
+
+
+def _clean_names(names):
+    return pd.Series(names, dtype="string").str.strip().str.lower()
+
+
+def _is_blank(names):
+    """Blank, "nan" and purely numeric names are not areas."""
+    s = _clean_names(names)
+    return (s.isna() | s.eq("") | s.eq("nan") | s.str.fullmatch(r"\d+")).fillna(True).to_numpy(dtype=bool)
+
+
+def detect_level(names, fips=None):
+    """Classify every row as nation/region/state/county/tract (or None).
+
+    Names are compared after normalize_name(), so footnoted spellings such as
+    "Texas 2/" or "Alabama*" still count. FIPS codes, when given, take
+    precedence: 2 digits or ``SS000`` is a state, 5 digits a county and 11
+    digits a tract; ``00``/``00000`` is the nation.
+    """
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=True)
+    normalized = np.array([normalize_name(u) for u in uniques] + [""], dtype=object)
+    s = pd.Series(normalized[codes], dtype="string")
+    level = np.full(len(s), None, dtype=object)
+
+    level[s.isin(_STATE_NAMES).fillna(False).to_numpy(dtype=bool)] = "state"
+    level[s.str.contains(_COUNTY_PATTERN, regex=True).fillna(False).to_numpy(dtype=bool)] = "county"
+    level[s.str.contains("census tract", regex=False).fillna(False).to_numpy(dtype=bool)] = "tract"
+    level[s.isin(_REGION_NAMES).fillna(False).to_numpy(dtype=bool)] = "region"
+    level[s.isin(["united states", "us", "usa"]).fillna(False).to_numpy(dtype=bool)] = "nation"
+
+    if fips is not None:
+        code = pd.Series(fips, dtype="string").str.strip().str.replace(r"\.0$", "", regex=True)
+        digits = code.str.fullmatch(r"\d+").fillna(False).to_numpy(dtype=bool)
+        width = code.str.len().fillna(0).to_numpy()
+        nation = digits & code.str.fullmatch(r"0+").fillna(False).to_numpy(dtype=bool)
+        state = digits & ((width <= 2) | ((width == 5) & code.str.endswith("000").fillna(False).to_numpy(dtype=bool)))
+        county = digits & (width == 5) & ~state
+        tract = digits & (width == 11)
+        level[county] = "county"
+        level[tract] = "tract"
+        level[state] = "state"
+        level[nation] = "nation"
+
+    level[_is_blank(names)] = None
+    return level
+
+
+def dominant_level(levels):
+    """Finest level present in ``levels`` (the level the table is about)."""
+    present = set(levels[pd.notna(levels)]) if len(levels) else set()
+    for lvl in reversed(LEVELS):
+        if lvl in present:
+            return lvl
+    return "state"
+
+
+def drop_aggregate_rows(df, name_col="Name", fips_col=None):
+    """Keep only the rows at the table's finest geographic level.
+
+    State names are a closed list, so in a state table anything unrecognised
+    (footnotes, source notes) is dropped. County and tract names vary too much
+    for that, so unrecognised rows are kept there, except blank and
+    numeric-only names. Returns (filtered_df, level).
+    """
+    fips = df[fips_col] if fips_col and fips_col in df.columns else None
+    levels = detect_level(df[name_col], fips)
+    level = dominant_level(levels)
+
+    keep = levels == level
+    if level in ("county", "tract"):
+        keep |= pd.isna(levels)
+    keep &= ~_is_blank(df[name_col])
+    return df[keep], level
+
+
+def level_label(level):
+    return LEVEL_LABELS.get(level, "Areas")
+
+
+# ---------------------------------------------------------
+# FIPS-keyed hierarchy
+# ---------------------------------------------------------
+_STATE_BY_FIPS = {fips: (name, region) for fips, _, name, region in STATES}
+_ABBR_BY_FIPS = {fips: abbr for fips, abbr, _, _ in STATES}
+_FIPS_BY_NAME = {name.lower(): fips for fips, _, name, _ in STATES}
+
+# Width of the FIPS prefix identifying each level.
+_FIPS_WIDTH = {"tract": 11, "county": 5, "state": 2}
+
+
+def normalize_fips(fips):
+    """FIPS codes as zero-padded strings; state codes given as SS000 become SS."""
+    code = pd.Series(fips, dtype="string").str.strip().str.replace(r"\.0$", "", regex=True)
+    width = code.str.len()
+    code = code.where(~width.isin([1, 4, 10]), "0" + code)  # leading zero lost in Excel
+    is_state = code.str.len().eq(5) & code.str.endswith("000")
+    return code.where(~is_state.fillna(False), code.str[:2])
+
+
+def fips_column(df):
+    """FIPS codes from a sheet's FIPS / GEOID column(s), or None if it has none.
+
+    A single code column is used as is; separate state and county FIPS
+    columns are combined into the 5-digit county code. The cleaners keep
+    these codes because county rows can only be keyed by them in the State
+    Panel: county names repeat across states.
+    """
+    cols = [c for c in df.columns if re.search(r"fips|geoid|geo_id", str(c).lower())]
+    if not cols:
+        return None
+    state = [c for c in cols if "state" in str(c).lower()]
+    county = [c for c in cols if "county" in str(c).lower()]
+    if state and county:
+        part = lambda c, w: (pd.Series(df[c], dtype="string").str.strip()
+                             .str.replace(r"\.0$", "", regex=True).str.zfill(w))
+        return normalize_fips(part(state[0], 2) + part(county[0], 3))
+    plain = [c for c in cols if c not in state]
+    return normalize_fips(df[(plain or state)[0]])
+
+
+def state_fips(names):
+    """FIPS codes for exact state names (None where the name isn't a state)."""
+    return _clean_names(names).map(_FIPS_BY_NAME).to_numpy(dtype=object, na_value=None)
+
+
+def state_abbr(fips):
+    """Postal abbreviation of the state each FIPS code belongs to (or None)."""
+    return np.array([_ABBR_BY_FIPS.get(f[:2]) if isinstance(f, str) else None
+                     for f in normalize_fips(fips)], dtype=object)
+
+
+class GeoIndex:
+    """Geography dimension over a leaf table keyed by FIPS code.
+
+    ``df`` holds one row per leaf area (tract, county or state). For every
+    level from the leaf up to the nation the index stores the integer code of
+    each row's ancestor, so a roll-up is a single bincount over those codes.
+    """
+
+    def __init__(self, df, fips_col="FIPS"):
+        self.df = df
+        fips = normalize_fips(df[fips_col])
+        width = int(fips.str.len().fillna(0).max())
+        self.leaf = {11: "tract", 5: "county"}.get(width, "state")
+        self.levels = LEVELS[LEVELS.index(self.leaf)::-1]  # leaf first
+
+        state = fips.str[:2].to_numpy(dtype=object, na_value=None)
+        region = np.array([(_STATE_BY_FIPS.get(f) or (None, None))[1] for f in state],
+                          dtype=object)
+        # Like the Census "United States" rows: the 50 states + DC, not PR.
+        nation = np.where(pd.notna(region), "US", None).astype(object)
+        keys = {"state": state, "region": region, "nation": nation}
+        for level in ("county", "tract"):
+            if level in self.levels:
+                keys[level] = fips.str[:_FIPS_WIDTH[level]].to_numpy(dtype=object, na_value=None)
+
+        self._codes = {}
+        for level in self.levels:
+            codes, labels = pd.factorize(keys[level])  # missing parents -> -1
+            self._codes[level] = (codes, pd.Index(labels, name=level))
+        self._cache = {}
+
+    def parent_codes(self, level):
+        """(codes, labels): for each leaf row, the index of its ``level`` ancestor."""
+        return self._codes[level]
+
+    @staticmethod
+    def label(level, key):
+        if level == "state":
+            return (_STATE_BY_FIPS.get(key) or (key, None))[0]
+        if level == "nation":
+            return "United States"
+        return key
+
+    def rollup(self, columns, level, how="sum", weight=None):
+        """Aggregate ``columns`` to ``level``.
+
+        how="sum" adds the values (counts such as population); how="mean" with
+        ``weight`` gives a weighted mean (e.g. a growth rate weighted by
+        population). NaNs are skipped. Results are cached per call signature.
+        """
+        key = (tuple(columns), level, how, weight)
+        if key in self._cache:
+            return self._cache[key]
+
+        codes, labels = self._codes[level]
+        valid = codes >= 0
+        codes = codes[valid]
+        n = len(labels)
+        w = None
+        if weight is not None:
+            w = self.df[weight].to_numpy(dtype=float, na_value=np.nan)[valid]
+
+        out = {}
+        for col in columns:
+            x = self.df[col].to_numpy(dtype=float, na_value=np.nan)[valid]
+            ok = ~np.isnan(x)
+            if how == "sum":
+                out[col] = np.bincount(codes[ok], weights=x[ok], minlength=n)
+            elif how == "mean":
+                ww = np.ones_like(x) if w is None else w
+                ok &= ~np.isnan(ww)
+                num = np.bincount(codes[ok], weights=(x * ww)[ok], minlength=n)
+                den = np.bincount(codes[ok], weights=ww[ok], minlength=n)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[col] = num / den
+            else:
+                raise ValueError(f"Unknown roll-up: {how}")
+
+        result = pd.DataFrame(out, index=labels)
+        result.insert(0, "Name", [self.label(level, k) for k in labels])
+        self._cache[key] = result
+        return result
+
+
+CACHE_DIR = os.path.join(storage.OUT_DIR, ".cache", "geo")
+
+
+def rollup_tables(df, rollups, fips_col="FIPS", cache_dir=CACHE_DIR):
+    """{level: table} for every level of GeoIndex(df), leaf first.
+
+    ``rollups`` is a list of (columns, how, weight) as taken by
+    GeoIndex.rollup(); their results are joined side by side per level. The
+    tables are cached on disk under a hash of the columns involved, so an
+    unchanged report skips building the index.
+    """
+    cols = [fips_col]
+    for columns, _, weight in rollups:
+        cols += list(columns) + ([weight] if weight else [])
+    cols = list(dict.fromkeys(cols))
+    h = hashlib.sha256(pd.util.hash_pandas_object(df[cols], index=False).to_numpy().tobytes())
+    h.update(repr((cols, rollups)).encode())
+    path = os.path.join(cache_dir, f"{h.hexdigest()[:20]}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    index = GeoIndex(df, fips_col)
+    tables = {}
+    for level in index.levels:
+        parts = [index.rollup(columns, level, how, weight) for columns, how, weight in rollups]
+        tables[level] = parts[0].join([p.drop(columns="Name") for p in parts[1:]])
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(tables, path)
+    return tables
+
+
+# ---------------------------------------------------------
+# Name -> FIPS resolution
+# ---------------------------------------------------------
+_COUNTY_SUFFIX = re.compile(
+    r"\s+(?:county|parish|borough|census area|municipality|municipio|city and borough)\b")
+
+
+def normalize_name(name):
+    """Canonical spelling of an area name for lookups.
+
+    Lower-cases, drops accents, footnote markers ("(1)", "[a]", "*", "Texas2"),
+    periods and stray punctuation, spells out "St." and collapses spaces.
+    """
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return ""
+    s = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    s = s.lower()
+    s = re.sub(r"\(.*?\)|\[.*?\]|[*\u2020\u2021]", " ", s)
+    s = re.sub(r"(?<=[a-z])\d+(?:/)?(?=\s|,|$)|\s\d+/", " ", s)
+    s = s.replace("&", " and ").replace(".", "")
+    s = re.sub(r"\bst\b", "saint", s)
+    s = re.sub(r"[^a-z0-9,' ]", " ", s)
+    s = re.sub(r"\s*,\s*", ", ", s)
+    return re.sub(r"\s+", " ", s).strip(" ,")
+
+
+class NameResolver:
+    """Hash index from normalised area names to FIPS codes.
+
+    Knows every state (by name and postal abbreviation) out of the box;
+    county names are learned from any table that carries FIPS codes via
+    add(). Unknown spellings fall back to the closest known name when it is
+    at least ``cutoff`` similar.
+    """
+
+    def __init__(self, cutoff=0.88):
+        self.cutoff = cutoff
+        self.index = {"united states": "00", "us": "00", "usa": "00"}
+        self.names = {"00": "United States"}
+        for fips, abbr, name, _ in STATES:
+            self.names[fips] = name
+            self.index[normalize_name(name)] = fips
+            self.index[abbr.lower()] = fips
+        self._keys = list(self.index)
+        self.lookup = lru_cache(maxsize=65536)(self._lookup)
+
+    def _variants(self, name, fips):
+        key = normalize_name(name)
+        yield key
+        if len(fips) == 5 and "," in key:
+            # "autauga county, alabama" -> also "autauga, alabama", "autauga county, al"
+            area, state = key.rsplit(", ", 1)
+            short = _COUNTY_SUFFIX.sub("", area)
+            abbr = _ABBR_BY_FIPS.get(fips[:2], "").lower()
+            for a in {area, short}:
+                yield f"{a}, {state}"
+                if abbr:
+                    yield f"{a}, {abbr}"
+
+    def add(self, names, fips):
+        """Learn the spellings in ``names`` for the matching ``fips`` codes."""
+        for name, code in zip(names, normalize_fips(fips)):
+            if pd.isna(code) or not normalize_name(name):
+                continue
+            self.names.setdefault(code, str(name).strip())
+            for key in self._variants(name, code):
+                self.index.setdefault(key, code)
+        self._keys = list(self.index)
+        self.lookup.cache_clear()
+
+    def _lookup(self, key):
+        if not key:
+            return None
+        if key in self.index:
+            return self.index[key]
+        if len(key) <= 3:
+            return None  # too short to fuzzy-match safely
+        match = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.cutoff)
+        return self.index[match[0]] if match else None
+
+    def resolve(self, names):
+        """FIPS code for every name (None where unresolved).
+
+        Each distinct name is normalised and looked up once.
+        """
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=True)
+        resolved = np.array([self.lookup(normalize_name(u)) for u in uniques] + [None],
+                            dtype=object)
+        return resolved[codes]  # code -1 picks the trailing None
+
+    def canonical_name(self, fips):
+        return self.names.get(fips)
+
+
+resolver = NameResolver()
+
+
+def resolve_fips(names):
+    """FIPS codes for free-text area names using the shared resolver."""
+    return resolver.resolve(names)
+
+
+def join_reports(tables, name_col="Name", fips_col="FIPS", resolver=resolver):
+    """Outer-join several area-level reports on resolved FIPS codes.
+
+    ``tables`` maps a label to a cleaned report. Rows are keyed by their
+    FIPS column when present (which also teaches the resolver those
+    spellings), otherwise by resolving the name. Columns that clash between
+    reports are prefixed with the report label. Returns
+    (panel, unresolved) where ``unresolved`` maps label -> unmatched names.
+    """
+    for df in tables.values():
+        if fips_col in df.columns:
+            resolver.add(df[name_col], df[fips_col])
+
+    keyed, unresolved = {}, {}
+    for label, df in tables.items():
+        fips = resolver.resolve(df[name_col])
+        if fips_col in df.columns:
+            given = normalize_fips(df[fips_col]).to_numpy(dtype=object, na_value=None)
+            fips = np.where(pd.notna(given), given, fips)
+        ok = pd.notna(fips)
+        unresolved[label] = df.loc[~ok, name_col].tolist()
+        part = df[ok].drop(columns=[c for c in (name_col, fips_col) if c in df.columns])
+        part.index = pd.Index(fips[ok], name="FIPS")
+        keyed[label] = part[~part.index.duplicated()]
+
+    counts = pd.Series([c for part in keyed.values() for c in part.columns]).value_counts()
+    clashes = set(counts[counts > 1].index)
+    parts = [part.rename(columns={c: f"{label}_{c}" for c in part.columns if c in clashes})
+             for label, part in keyed.items()]
+
+    panel = pd.concat(parts, axis=1, join="outer").sort_index()
+    panel.insert(0, "Name", [resolver.canonical_name(f) for f in panel.index])
+    return panel.reset_index(), unresolved
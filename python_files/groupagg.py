@@ -0,0 +1,170 @@
+"""Grouped aggregation on reusable, factorized group keys.
+
+GroupIndex factorizes each key column once and keeps the integer codes.
+Any breakdown over a subset of those keys (per year, per region, region x
+year, ...) combines the stored codes into one dense group code per row; that
+grouping is cached too. The aggregates run as kernels over the codes:
+np.bincount for count/sum/mean/weighted mean/share. For medians and other
+quantiles each column is argsorted once, and every grouping then only needs
+a stable (radix) sort of its small integer codes in that order. Missing
+values are skipped per column, and rows with a missing key are left out of
+every group, as in DataFrame.groupby.
+"""
+import numpy as np
+import pandas as pd
+
+
+class GroupIndex:
+    """Factorized group keys of ``df`` shared by every breakdown."""
+
+    def __init__(self, df, keys):
+        self.df = df
+        self.keys = list(keys)
+        self._codes = {k: pd.factorize(df[k], sort=True) for k in self.keys}
+        self._groupings = {}
+        self._values = {}
+        self._orders = {}
+
+    def grouping(self, keys):
+        """(row codes, number of groups, group index) for a tuple of keys.
+
+        Row codes are -1 where any key is missing.
+        """
+        keys = tuple([keys] if isinstance(keys, str) else keys)
+        if keys not in self._groupings:
+            codes = [self._codes[k][0] for k in keys]
+            sizes = [len(self._codes[k][1]) for k in keys]
+            missing = np.zeros(len(self.df), dtype=bool)
+            for c in codes:
+                missing |= c < 0
+
+            # Mixed-radix code over all keys, then keep only observed groups
+            combined = np.ravel_multi_index([np.where(missing, 0, c) for c in codes], sizes)
+            present = np.bincount(combined[~missing], minlength=int(np.prod(sizes))) > 0
+            observed = np.flatnonzero(present)
+            dense = np.cumsum(present) - 1
+            row_codes = np.where(missing, -1, dense[combined])
+
+            if len(keys) == 1:
+                index = pd.Index(self._codes[keys[0]][1][observed], name=keys[0])
+            else:
+                parts = np.unravel_index(observed, sizes)
+                index = pd.MultiIndex.from_arrays(
+                    [self._codes[k][1][p] for k, p in zip(keys, parts)], names=keys)
+            self._groupings[keys] = (row_codes, len(observed), index)
+        return self._groupings[keys]
+
+    def _column(self, col):
+        if col not in self._values:
+            self._values[col] = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+        return self._values[col]
+
+    def _value_order(self, col):
+        """Row positions of the non-missing values of ``col``, ascending."""
+        if col not in self._orders:
+            values = self._column(col)
+            order = np.argsort(values, kind="stable")
+            self._orders[col] = order[:np.count_nonzero(~np.isnan(values))]
+        return self._orders[col]
+
+    def _sums(self, keys, col, weights=None):
+        """Per-group (sum of values [x weights], sum of weights or count)."""
+        codes, n, _ = self.grouping(keys)
+        values = self._column(col)
+        ok = (codes >= 0) & ~np.isnan(values)
+        w = np.ones(len(values)) if weights is None else self._column(weights)
+        ok &= ~np.isnan(w)
+        total = np.bincount(codes[ok], weights=values[ok] * w[ok], minlength=n)
+        denom = np.bincount(codes[ok], weights=w[ok], minlength=n)
+        return total, denom
+
+    # ---------------------------------------------------------
+    # Aggregates
+    # ---------------------------------------------------------
+    def size(self, keys):
+        codes, n, index = self.grouping(keys)
+        return pd.Series(np.bincount(codes[codes >= 0], minlength=n), index=index,
+                         name="Count")
+
+    def sum(self, keys, columns):
+        _, _, index = self.grouping(keys)
+        return pd.DataFrame({c: self._sums(keys, c)[0] for c in columns}, index=index)
+
+    def mean(self, keys, columns):
+        _, _, index = self.grouping(keys)
+        out = {}
+        for c in columns:
+            total, count = self._sums(keys, c)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[c] = total / count
+        return pd.DataFrame(out, index=index)
+
+    def weighted_mean(self, keys, columns, weight):
+        """Mean of each column weighted by column ``weight``."""
+        _, _, index = self.grouping(keys)
+        out = {}
+        for c in columns:
+            total, w = self._sums(keys, c, weights=weight)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[c] = total / w
+        return pd.DataFrame(out, index=index)
+
+    def quantile(self, keys, columns, q):
+        """Per-group quantile ``q`` (linear interpolation, as pandas)."""
+        codes, n, index = self.grouping(keys)
+        out = {}
+        small = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        for c in columns:
+            order = self._value_order(c)
+            g = codes[order]
+            order, g = order[g >= 0], g[g >= 0]
+            # Stable sort by group keeps each group's values ascending
+            v = self._column(c)[order[np.argsort(g.astype(small), kind="stable")]]
+            counts = np.bincount(g, minlength=n)
+            starts = np.cumsum(counts) - counts
+            has = counts > 0
+            pos = q * np.maximum(counts - 1, 0)
+            lo = starts + np.floor(pos).astype(int)
+            hi = starts + np.ceil(pos).astype(int)
+            frac = pos - np.floor(pos)
+            result = np.full(n, np.nan)
+            result[has] = v[lo[has]] + (v[hi[has]] - v[lo[has]]) * frac[has]
+            out[c] = result
+        return pd.DataFrame(out, index=index)
+
+    def median(self, keys, columns):
+        return self.quantile(keys, columns, 0.5)
+
+    def share(self, keys, columns, within=()):
+        """Each group's share (%) of the column total.
+
+        ``within`` names a coarser key set the shares are normalized over,
+        e.g. share(["Year", "Region"], cols, within=["Year"]) sums to 100
+        within every year.
+        """
+        codes, n, index = self.grouping(keys)
+        within = [within] if isinstance(within, str) else list(within)
+        if within:
+            parent_codes, m, _ = self.grouping(within)
+            # Parent of each group, taken from any of its rows
+            parent = np.zeros(n, dtype=int)
+            ok = codes >= 0
+            parent[codes[ok]] = parent_codes[ok]
+        out = {}
+        for c in columns:
+            total, _ = self._sums(keys, c)
+            if within:
+                denom = np.bincount(parent, weights=total, minlength=m)[parent]
+            else:
+                denom = total.sum()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[c] = total / denom * 100
+        return pd.DataFrame(out, index=index)
+
+    def aggregate(self, keys, columns, how="mean", weight=None):
+        """One of mean / median / sum / weighted_mean / share by name."""
+        if how == "weighted_mean":
+            return self.weighted_mean(keys, columns, weight)
+        if how not in ("mean", "median", "sum", "share"):
+            raise ValueError(f"Unknown aggregate: {how}")
+        return getattr(self, how)(keys, columns)
@@ -0,0 +1,125 @@
+"""Population growth and projections for every area at once.
+
+The Pop_<year> columns form one (areas x years) matrix of log populations,
+and every quantity is a matrix operation over it:
+- cagr(): compound annual growth between every pair of census years
+- acceleration(): change in CAGR from one period to the next
+- project(): a log-linear trend (OLS of log population on year) per area,
+  extrapolated to 2030/2040 with t-based prediction intervals
+
+The regression uses per-row sums with a missing-value mask, so each area is
+fitted on whichever years it has and no row is ever handled in Python; tract-
+level inputs cost the same few array passes. tables() bundles the three and
+is cached on disk under a hash of the input matrix.
+"""
+import hashlib
+import os
+import re
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import stats as sps
+
+from python_files import storage
+
+CACHE_DIR = os.path.join(storage.OUT_DIR, ".cache", "growth")
+TARGETS = (2030, 2040)
+LEVEL = 0.90
+
+
+def population_matrix(df):
+    """(years, matrix) from the Pop_<year> columns, years ascending."""
+    cols = sorted((c for c in df.columns if re.fullmatch(r"Pop_\d{4}", c)),
+                  key=lambda c: int(c[4:]))
+    years = np.array([int(c[4:]) for c in cols])
+    P = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return years, P
+
+
+def _log(P):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.log(np.where(P > 0, P, np.nan))
+
+
+def cagr(years, P):
+    """CAGR (%) for every pair of years: columns CAGR_<from>_<to>."""
+    logP = _log(P)
+    i, j = np.triu_indices(len(years), k=1)
+    rates = np.expm1((logP[:, j] - logP[:, i]) / (years[j] - years[i])) * 100
+    return pd.DataFrame(rates, columns=[f"CAGR_{years[a]}_{years[b]}" for a, b in zip(i, j)])
+
+
+def acceleration(years, P):
+    """Change in CAGR (percentage points) between consecutive periods.
+
+    Accel_<y1>_<y2>_<y3> compares growth over y2..y3 with y1..y2.
+    """
+    logP = _log(P)
+    period = np.expm1(np.diff(logP, axis=1) / np.diff(years)) * 100
+    accel = np.diff(period, axis=1)
+    names = [f"Accel_{a}_{b}_{c}" for a, b, c in zip(years, years[1:], years[2:])]
+    return pd.DataFrame(accel, columns=names)
+
+
+def project(years, P, targets=TARGETS, level=LEVEL):
+    """Log-linear trend projections with ``level`` prediction intervals.
+
+    Columns per target: Proj_<t>, Proj_<t>_Low, Proj_<t>_High, plus the
+    fitted annual growth (%) and the number of years used.
+    """
+    y = _log(P)
+    w = ~np.isnan(y)
+    t = (years - years.mean()).astype(float)[None, :]  # centred for stability
+    y0 = np.where(w, y, 0.0)
+
+    n = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tbar = (w * t).sum(axis=1) / n
+        ybar = y0.sum(axis=1) / n
+        dt = np.where(w, t - tbar[:, None], 0.0)
+        sxx = (dt * dt).sum(axis=1)
+        slope = (dt * (y0 - ybar[:, None])).sum(axis=1) / sxx
+        intercept = ybar - slope * tbar
+        resid = np.where(w, y0 - intercept[:, None] - slope[:, None] * t, 0.0)
+        dof = n - 2
+        s2 = (resid * resid).sum(axis=1) / dof
+
+    out = {"Trend_Growth_Pct": np.expm1(slope) * 100, "Years_Used": n}
+    # Two points fit exactly: a projection but no interval
+    crit = np.where(dof > 0, sps.t.ppf(0.5 + level / 2, np.maximum(dof, 1)), np.nan)
+    for target in targets:
+        t0 = target - years.mean()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fit = intercept + slope * t0
+            se = np.sqrt(s2 * (1 + 1 / n + (t0 - tbar) ** 2 / sxx))
+        half = crit * se
+        out[f"Proj_{target}"] = np.exp(fit)
+        out[f"Proj_{target}_Low"] = np.exp(fit - half)
+        out[f"Proj_{target}_High"] = np.exp(fit + half)
+    return pd.DataFrame(out)
+
+
+# ---------------------------------------------------------
+# Cached tables
+# ---------------------------------------------------------
+def _hash(years, P, targets, level):
+    h = hashlib.sha256(np.ascontiguousarray(P).tobytes())
+    h.update(repr((years.tolist(), P.shape, list(targets), level)).encode())
+    return h.hexdigest()[:20]
+
+
+def tables(df, name_col="Name", targets=TARGETS, level=LEVEL, cache_dir=CACHE_DIR):
+    """{"cagr", "acceleration", "projections"} tables keyed by ``name_col``."""
+    years, P = population_matrix(df)
+    path = os.path.join(cache_dir, f"{_hash(years, P, targets, level)}.joblib")
+    if os.path.exists(path):
+        computed = joblib.load(path)
+    else:
+        computed = {"cagr": cagr(years, P), "acceleration": acceleration(years, P),
+                    "projections": project(years, P, targets, level)}
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump(computed, path)
+
+    names = pd.DataFrame({name_col: df[name_col].to_numpy()})
+    return {k: pd.concat([names, t], axis=1) for k, t in computed.items()}
@@ -0,0 +1,159 @@
+"""Append-only incremental updates for the annual series.
+
+update() compares the cleaned series with what is already stored and only
+processes rows appended since the last run. Each new batch is written with
+storage.append_partition() (a new part file plus CSV rows appended); its
+year-over-year change columns are computed from the previous stored row and
+returned, but not stored. The decade means are kept as running sums and
+counts in a small state file (``output/<name>/_incremental.json``), so adding
+a year touches only that year. If an already-stored row was revised (the
+hash of the stored prefix no longer matches), or the stored parts and the
+state file disagree (a run stopped between writing them), the series is
+rebuilt from scratch.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from python_files import storage
+
+STATE_FILE = "_incremental.json"
+
+
+def _state_path(name, out_dir):
+    return os.path.join(out_dir, name, STATE_FILE)
+
+
+def _hash_rows(df):
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(rows.tobytes()).hexdigest()
+
+
+def _decades(keys):
+    if pd.api.types.is_datetime64_any_dtype(keys):
+        years = keys.dt.year
+    else:
+        years = pd.to_numeric(keys)
+    return (years // 10 * 10).astype(int).to_numpy()
+
+
+def load_state(name, out_dir=storage.OUT_DIR):
+    try:
+        with open(_state_path(name, out_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _reset(name, out_dir):
+    shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    csv_path = storage.table_path(name, out_dir, "csv")
+    if os.path.exists(csv_path):
+        os.remove(csv_path)
+
+
+def _stored_rows(name, out_dir):
+    try:
+        return storage.load_manifest(name, out_dir)["rows"]
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def _add_changes(df, value_cols, last=None):
+    """Add ``<col>_YoY_Change`` / ``<col>_YoY_Pct``; ``last`` holds the row before."""
+    last = last or {}
+    for c in value_cols:
+        values = df[c].to_numpy(dtype=float)
+        prev_value = last.get(c)
+        prev = np.concatenate(([np.nan if prev_value is None else prev_value], values[:-1]))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            df[f"{c}_YoY_Change"] = values - prev
+            df[f"{c}_YoY_Pct"] = (values / prev - 1) * 100
+    return df
+
+
+def update(df, name, key, value_cols, out_dir=storage.OUT_DIR):
+    """Store the rows of ``df`` that are new since the last run.
+
+    Returns a dict with ``new_rows`` (the appended batch, with
+    ``<col>_YoY_Change`` / ``<col>_YoY_Pct`` columns), ``rebuilt`` (True
+    when the stored series had to be recomputed) and ``decades`` (see
+    decade_means()).
+    """
+    df = df.sort_values(key, kind="stable").reset_index(drop=True)
+    value_cols = list(value_cols)
+    state = load_state(name, out_dir)
+
+    rebuilt = False
+    if state is not None:
+        n = state["rows"]
+        if (state["key"] != key or state["value_cols"] != value_cols or len(df) < n
+                or _stored_rows(name, out_dir) != n
+                or _hash_rows(df.iloc[:n]) != state["hash"]):
+            state = None
+            rebuilt = True
+    if state is None:
+        _reset(name, out_dir)
+        state = {"key": key, "value_cols": value_cols, "rows": 0, "hash": None,
+                 "last": {c: None for c in value_cols}, "decades": {}}
+
+    new = df.iloc[state["rows"]:].copy()
+    if len(new):
+        # Float everywhere so every part file has the same Arrow schema
+        new[value_cols] = new[value_cols].astype(float)
+
+        # Running decade sums: only the new rows are added in
+        decades = _decades(new[key])
+        for d in np.unique(decades):
+            rows = new[decades == d]
+            acc = state["decades"].setdefault(str(d), {c: [0.0, 0] for c in value_cols})
+            for c in value_cols:
+                acc[c][0] += float(rows[c].sum(skipna=True))
+                acc[c][1] += int(rows[c].notna().sum())
+
+        # The part is written before the state: if the run stops in between,
+        # the next one sees the row counts disagree and rebuilds
+        storage.append_partition(new, name, out_dir)
+
+        state["rows"] = len(df)
+        state["hash"] = _hash_rows(df)
+        previous = state["last"]
+        last = new[value_cols].iloc[-1]
+        state["last"] = {c: None if pd.isna(last[c]) else float(last[c]) for c in value_cols}
+        tmp = _state_path(name, out_dir) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, _state_path(name, out_dir))
+        new = _add_changes(new, value_cols, previous)
+
+    return {"new_rows": new, "rebuilt": rebuilt, "decades": decade_means(name, out_dir)}
+
+
+def decade_means(name, out_dir=storage.OUT_DIR):
+    """Decade means of the value columns from the running sums."""
+    state = load_state(name, out_dir)
+    if state is None or not state["decades"]:
+        return pd.DataFrame()
+    rows = {
+        int(d): {c: s / n if n else np.nan for c, (s, n) in acc.items()}
+        for d, acc in state["decades"].items()
+    }
+    table = pd.DataFrame.from_dict(rows, orient="index").sort_index()
+    table.index.name = "Decade"
+    return table
+
+
+def load(name, out_dir=storage.OUT_DIR, filters=(), changes=False):
+    """The stored series (all parts) as one DataFrame.
+
+    With ``changes=True`` the year-over-year change columns are added.
+    """
+    df = storage.read_partitioned(name, filters, out_dir=out_dir)
+    if changes:
+        state = load_state(name, out_dir)
+        df = _add_changes(df, state["value_cols"] if state else [])
+    return df
@@ -0,0 +1,121 @@
+"""Run a module in its own process with a time and memory budget.
+
+run() starts a fresh ("spawn") process per module run. The child caps its
+address space with RLIMIT_AS, seeds the workbooks the worker already parsed
+(prefetch.seed), runs runner.run_module() and sends the recorded result
+back through a pipe. The parent waits at most the time budget; a module
+that overruns is killed, and one that dies (e.g. killed by the kernel) is
+reported as crashed. Either way a failed result comes back instead of the
+worker hanging, and the other modules keep running in their own processes.
+
+Budgets are DEFAULT_TIMEOUT / DEFAULT_MEMORY_MB unless BUDGETS overrides
+them for a module; the MODULE_TIMEOUT and MODULE_MEMORY_MB environment
+variables change the defaults.
+"""
+import importlib
+import multiprocessing
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the time budget still applies
+    resource = None
+
+from python_files import prefetch, runner
+
+DEFAULT_TIMEOUT = float(os.environ.get("MODULE_TIMEOUT", 300))
+DEFAULT_MEMORY_MB = int(os.environ.get("MODULE_MEMORY_MB", 4096))
+
+# Module name -> {"timeout": seconds, "memory_mb": MB} overrides
+BUDGETS = {
+    "Housing_Stress_Clusters": {"timeout": 600},
+}
+
+# Grace period for a finished child to exit after sending its result
+_EXIT_SECONDS = 5
+
+
+def budget(module_name):
+    """(timeout seconds, memory MB) for ``module_name``."""
+    custom = BUDGETS.get(module_name, {})
+    return (custom.get("timeout", DEFAULT_TIMEOUT),
+            custom.get("memory_mb", DEFAULT_MEMORY_MB))
+
+
+def _limit_memory(memory_mb):
+    if resource is None or not memory_mb:
+        return
+    limit = int(memory_mb) * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _child(module_name, memory_mb, frames, conn):
+    # Runs in the spawned process, so it has to live at module level.
+    _limit_memory(memory_mb)
+    prefetch.seed(frames)
+    try:
+        module = importlib.import_module(f"python_files.{module_name}")
+        result = runner.run_module(module)
+    except MemoryError:
+        result = _failed("error", f"{module_name} ran out of memory "
+                                  f"(budget {memory_mb} MB)", 0.0)
+    conn.send(result)
+    conn.close()
+
+
+def _failed(status, error, seconds):
+    return {"records": [], "ok": False, "error": error, "status": status,
+            "seconds": seconds, "finished": time.time()}
+
+
+def run(module_name, timeout=None, memory_mb=None, frames=None, spent=0.0):
+    """Run ``module_name``.main() in a child process within its budget.
+
+    ``spent`` is time this run already used before the child starts (e.g.
+    waiting for its inputs); it counts against ``timeout``, and if nothing is
+    left the child isn't started. Returns runner.run_module()'s result dict
+    plus ``status``: "ok", "error" (main() raised), "timeout" or "crashed".
+    """
+    default_timeout, default_memory = budget(module_name)
+    timeout = default_timeout if timeout is None else timeout
+    memory_mb = default_memory if memory_mb is None else memory_mb
+    if spent >= timeout:
+        return _failed("timeout", f"{module_name} used its time budget of {timeout:g}s "
+                                  f"waiting for its inputs", spent)
+
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    # Not a daemon: the module may start its own pools (joblib, sklearn)
+    proc = ctx.Process(target=_child, name=f"module-{module_name}",
+                       args=(module_name, memory_mb, frames or {}, sender))
+    start = time.time() - spent
+    proc.start()
+    sender.close()  # the child holds the only write end: EOF if it dies
+
+    result = None
+    try:
+        if receiver.poll(timeout - spent):
+            result = receiver.recv()
+    except (EOFError, OSError):
+        pass
+    finally:
+        receiver.close()
+
+    proc.join(_EXIT_SECONDS if result is not None else 0.1)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+    seconds = time.time() - start
+    if result is not None:
+        result.setdefault("status", "ok" if result["ok"] else "error")
+        return result
+    if seconds >= timeout:
+        return _failed("timeout", f"{module_name} exceeded its time budget of "
+                                  f"{timeout:g}s and was stopped", seconds)
+    return _failed("crashed", f"{module_name} exited unexpectedly (exit code "
+                              f"{proc.exitcode}, memory budget {memory_mb} MB)", seconds)
@@ -0,0 +1,103 @@
+"""Lead/lag cross-correlation between every pair of macro series.
+
+cross_correlation() standardises each series, zero-pads it and takes one
+batched rfft of all of them. Every pair's cross-correlation at every lag
+is then a single product of spectra followed by one batched irfft. That is
+O(n log n) per pair, and adding indicator columns only adds rows to the
+batch. Missing months are zeroed, and each lag is divided by the number of
+months where both series are present (that count comes from the same FFT
+trick on the masks).
+
+A positive lag L means the first series leads: corr(x[t], y[t + L]).
+"""
+import numpy as np
+import pandas as pd
+
+TRANSFORMS = ("diff", "pct", None)
+
+
+def _prepare(df, columns, transform):
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan).T
+    if transform == "diff":
+        values = np.diff(values, axis=1)
+    elif transform == "pct":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = (values[:, 1:] / values[:, :-1] - 1) * 100
+    elif transform is not None:
+        raise ValueError(f"transform must be one of {TRANSFORMS}")
+    values[~np.isfinite(values)] = np.nan
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    count = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=1, keepdims=True) / count
+        std = np.sqrt((np.where(valid, filled - mean, 0.0) ** 2).sum(axis=1, keepdims=True) / count)
+        z = np.where(valid, (filled - mean) / std, 0.0)
+    z[~np.isfinite(z)] = 0.0  # constant or empty series correlate with nothing
+    return z, valid.astype(float)
+
+
+def cross_correlation(df, columns=None, max_lag=36, transform="diff", min_overlap=24):
+    """Cross-correlation of every column pair at lags -max_lag..max_lag.
+
+    Returns (lags, pairs, corr): ``pairs`` is a list of (x, y) column names
+    and ``corr`` a (len(pairs), len(lags)) array. Lags with fewer than
+    ``min_overlap`` shared observations are NaN. ``transform`` ("diff",
+    "pct" or None) is applied first so shared trends don't dominate.
+    """
+    if columns is None:
+        columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    columns = list(columns)
+    z, mask = _prepare(df, columns, transform)
+    n = z.shape[1]
+    max_lag = min(max_lag, n - 1)
+
+    # Zero padding to >= 2n - 1 turns circular correlation into linear
+    nfft = 1 << int(np.ceil(np.log2(max(2 * n - 1, 2))))
+    fz = np.fft.rfft(z, nfft, axis=1)
+    fm = np.fft.rfft(mask, nfft, axis=1)
+
+    i, j = np.triu_indices(len(columns), k=1)
+    sums = np.fft.irfft(np.conj(fz[i]) * fz[j], nfft, axis=1)
+    counts = np.rint(np.fft.irfft(np.conj(fm[i]) * fm[j], nfft, axis=1))
+
+    # Lags 0..max_lag sit at the start, -max_lag..-1 wrap round to the end
+    lags = np.arange(-max_lag, max_lag + 1)
+    sums = sums[:, lags % nfft]
+    counts = counts[:, lags % nfft]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.where(counts >= min_overlap, sums / counts, np.nan)
+
+    pairs = [(columns[a], columns[b]) for a, b in zip(i, j)]
+    return lags, pairs, np.clip(corr, -1.0, 1.0)
+
+
+def peak_table(lags, pairs, corr):
+    """Peak |correlation| per pair: x, y, peak_lag, peak_corr, corr_lag0."""
+    rows = np.arange(len(pairs))
+    best = np.where(np.isnan(corr), -np.inf, np.abs(corr)).argmax(axis=1)
+
+    table = pd.DataFrame({
+        "x": [p[0] for p in pairs],
+        "y": [p[1] for p in pairs],
+        "peak_lag": lags[best].astype(float),
+        "peak_corr": corr[rows, best],
+        "corr_lag0": corr[:, np.searchsorted(lags, 0)],
+    })
+    table.loc[table["peak_corr"].isna(), "peak_lag"] = np.nan
+    return table.sort_values("peak_corr", key=np.abs, ascending=False,
+                             ignore_index=True)
+
+
+def peak_matrix(table, columns, value="peak_corr"):
+    """Square (x, y) matrix of ``value``; the lower triangle mirrors it.
+
+    Mirrored lags change sign (if x leads y by L, y lags x by L).
+    """
+    mat = pd.DataFrame(np.nan, index=columns, columns=columns)
+    sign = -1 if value == "peak_lag" else 1
+    for x, y, v in zip(table["x"], table["y"], table[value]):
+        mat.loc[x, y] = v
+        mat.loc[y, x] = sign * v
+    return mat
@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import streamlit as st
 import os
 import re
 from pathlib import Path
 
+from python_files import geo, prefetch, report_utils, schema, significance, snapshots, storage
+
 
 def main():
     """Cleans the PovertyReport and generates figures (Streamlit-safe)."""
@@ -18,7 +21,7 @@ def main():
     # =============================
     # 1. Load sheet and detect header
     # =============================
-    raw = pd.read_excel(in_file, sheet_name=in_sheet, header=None)
+    raw = prefetch.read_excel(in_file, sheet_name=in_sheet, header=None)
     n_rows, n_cols = raw.shape
 
     def is_empty_cell(v):
@@ -161,25 +164,40 @@ def main():
         "Children_Upper_Bound": data.iloc[:, idx_ch_ub],
     })
 
-    # Drop empty names
-    U = U[U["Name"].str.strip() != ""].copy()
-    U = U[U["Name"].str.lower() != "nan"].copy()
-    U = U[U["Name"].str.lower() != "united states"].copy()
+    fips = geo.fips_column(data)
+    if fips is not None:
+        U.insert(1, "FIPS", fips)
+
+    # Drop empty names and aggregate (national / regional / state-subtotal) rows
+    U, level = geo.drop_aggregate_rows(U, fips_col="FIPS")
+    U = U.copy()
+    areas = geo.level_label(level)
 
     # Convert numerics
-    num_cols = [c for c in U.columns if c != "Name"]
+    num_cols = [c for c in U.columns if c not in ("Name", "FIPS")]
     for c in num_cols:
         U[c] = pd.to_numeric(U[c], errors="coerce")
 
+    # State sheets carry no codes: resolve them from the names
+    if "FIPS" not in U.columns and level == "state":
+        U.insert(1, "FIPS", geo.resolve_fips(U["Name"]))
+
+    report = schema.validate(U, "poverty")
+    if not report.ok:
+        st.warning("⚠️ Schema violations in the cleaned poverty table:")
+        if report.missing:
+            st.write("Missing columns:", report.missing)
+        st.dataframe(report.violations[report.violations["count"] > 0])
+
     # =============================
     # 6. Plots → save to files
     # =============================
     # Hist: All people
     hist_all_path = os.path.join(out_dir, "poverty_all_hist.png")
     plt.figure(figsize=(9, 4.8))
-    plt.hist(U["All_Poverty_Pct"].dropna(), bins=15)
+    report_utils.plot_histogram(plt.gca(), U["All_Poverty_Pct"], bins=15)
     plt.xlabel("Poverty rate (%) – All people")
-    plt.ylabel("States")
+    plt.ylabel(areas)
     plt.title("Distribution of Poverty Rates (All People)")
     plt.grid(True)
     plt.tight_layout()
@@ -189,9 +207,9 @@ def main():
     # Hist: Children
     hist_child_path = os.path.join(out_dir, "poverty_children_hist.png")
     plt.figure(figsize=(9, 4.8))
-    plt.hist(U["Children_Poverty_Pct"].dropna(), bins=15)
+    report_utils.plot_histogram(plt.gca(), U["Children_Poverty_Pct"], bins=15)
     plt.xlabel("Poverty rate (%) – Children")
-    plt.ylabel("States")
+    plt.ylabel(areas)
     plt.title("Distribution of Poverty Rates (Children)")
     plt.grid(True)
     plt.tight_layout()
@@ -199,7 +217,7 @@ def main():
     plt.close()
 
     # Top 10 bar chart
-    top10 = U.sort_values("All_Poverty_Pct", ascending=False).head(10)
+    top10 = report_utils.top_k(U, "All_Poverty_Pct", 10)
     top10_path = os.path.join(out_dir, "poverty_all_top10.png")
     plt.figure(figsize=(9, 5.6))
     plt.barh(top10["Name"], top10["All_Poverty_Pct"])
@@ -214,7 +232,7 @@ def main():
     # Scatter plot
     scatter_path = os.path.join(out_dir, "poverty_scatter.png")
     plt.figure(figsize=(9, 6.2))
-    plt.scatter(U["All_Poverty_Pct"], U["Children_Poverty_Pct"], s=36)
+    report_utils.scatter(plt.gca(), U["All_Poverty_Pct"], U["Children_Poverty_Pct"])
     plt.xlabel("All People Poverty Rate (%)")
     plt.ylabel("Children Poverty Rate (%)")
     plt.title("Children vs All Poverty Rates")
@@ -225,9 +243,36 @@ def main():
     plt.savefig(scatter_path)
     plt.close()
 
-    # Save cleaned CSV
-    out_csv = os.path.join(out_dir, "Poverty_Clean.csv")
-    U.to_csv(out_csv, index=False)
+    # Save cleaned table (Feather + Parquet + CSV)
+    storage.save_table(U, "Poverty_Clean", out_dir)
+
+    # Ranking that only separates areas whose 90% intervals say they differ.
+    # Both tables keep U's row order, so they line up by position even where
+    # county names repeat.
+    ranking = significance.rank_table(U, "Name", "All_Poverty_Pct", "All_Lower_Bound",
+                                      "All_Upper_Bound", prefix="All", sort=False)
+    children = significance.rank_table(U, "Name", "Children_Poverty_Pct", "Children_Lower_Bound",
+                                       "Children_Upper_Bound", prefix="Children", sort=False)
+    ranking = (pd.concat([ranking, children.drop(columns="Name")], axis=1)
+               .sort_values("All_Rank", kind="stable").reset_index(drop=True))
+    storage.save_table(ranking, "Poverty_Ranking", out_dir)
+
+    st.subheader("📋 Cleaned Poverty Table")
+    st.dataframe(U, hide_index=True)
+
+    st.subheader("🏅 Poverty Ranking")
+    st.caption("Rank_Min / Rank_Max: the ranks each area could hold given the 90% "
+               "confidence bounds (areas whose intervals overlap can swap places).")
+    st.dataframe(ranking, hide_index=True)
+
+    # Keep an immutable version and record what changed since the last one
+    version = snapshots.commit(U, "Poverty", key=snapshots.unique_key(U))
+    if version["version"] > 1:
+        try:
+            changes = snapshots.diff("Poverty", version["version"] - 1, version["version"])
+            storage.save_table(changes, "Poverty_Changes", out_dir)
+        except ValueError:
+            pass  # the versions have no common key to compare on
 
     # Return to Streamlit
     return U, hist_all_path, hist_child_path, top10_path, scatter_path
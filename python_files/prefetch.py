@@ -0,0 +1,123 @@
+"""Concurrent workbook prefetching for the Streamlit dashboard.
+
+Parsing .xlsx files is the slowest part of every page load, and each module
+used to do it inside its own main(), one after another. start() schedules all
+of the parses at once on a process pool, driven by an asyncio loop running in
+a background thread. Modules call read_excel() exactly like pd.read_excel();
+if a prefetch for the same file and arguments is pending they wait on its
+future instead of parsing the file a second time. Futures remember the
+file's mtime, so a workbook that changed after it was prefetched is parsed
+again rather than served stale.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import pandas as pd
+
+_loop = None
+_executor = None
+_futures = {}
+_lock = threading.Lock()
+
+
+def _key(path, kwargs):
+    return (os.path.abspath(path), tuple(sorted(kwargs.items())))
+
+
+def _parse(path, kwargs):
+    # Runs in a worker process, so it has to live at module level.
+    return pd.read_excel(path, **kwargs)
+
+
+def _ensure_loop():
+    global _loop, _executor
+
+    if _loop is None:
+        # "spawn" avoids forking the Streamlit server with its threads held.
+        ctx = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(max_workers=min(8, os.cpu_count() or 1),
+                                        mp_context=ctx)
+        _loop = asyncio.new_event_loop()
+        threading.Thread(target=_loop.run_forever, name="workbook-prefetch",
+                         daemon=True).start()
+    return _loop
+
+
+async def _load(path, kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _parse, path, kwargs)
+
+
+def start(specs):
+    """Start parsing every workbook in ``specs`` concurrently.
+
+    ``specs`` maps a file path to the keyword arguments its module passes to
+    read_excel(). Missing files are skipped. Returns {path: future}.
+    """
+    loop = _ensure_loop()
+    started = {}
+
+    with _lock:
+        for path, kwargs in specs.items():
+            if not os.path.exists(path):
+                continue
+            key = _key(path, kwargs)
+            mtime = os.path.getmtime(path)
+            if key not in _futures or _futures[key][0] != mtime:
+                _futures[key] = (mtime, asyncio.run_coroutine_threadsafe(_load(path, kwargs), loop))
+            started[path] = _futures[key][1]
+
+    return started
+
+
+def get(path, **kwargs):
+    """Return the pending future for ``path`` (or None) and release it."""
+    with _lock:
+        mtime, future = _futures.pop(_key(path, kwargs), (None, None))
+    if future is None or not os.path.exists(path) or os.path.getmtime(path) != mtime:
+        return None
+    return future
+
+
+def parsed(specs, timeout=None):
+    """Finished parses for ``specs`` as {(path, kwargs): (mtime, DataFrame)}.
+
+    Waits for pending parses but leaves them in place, so several consumers
+    (e.g. isolated module processes, see seed()) can share one parse. With a
+    ``timeout`` it waits at most that many seconds in total; parses still
+    running then are left out (the consumer parses those files itself).
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    out = {}
+    for path, kwargs in specs.items():
+        with _lock:
+            mtime, future = _futures.get(_key(path, kwargs), (None, None))
+        if future is None or not os.path.exists(path) or os.path.getmtime(path) != mtime:
+            continue
+        try:
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            out[(path, tuple(sorted(kwargs.items())))] = (mtime, future.result(left))
+        except Exception:  # includes the wait timing out
+            continue  # the module will hit (and report) the error itself
+    return out
+
+
+def seed(frames):
+    """Register parses from parsed() (made in another process) as done."""
+    with _lock:
+        for (path, items), (mtime, df) in frames.items():
+            future = Future()
+            future.set_result(df)
+            _futures[_key(path, dict(items))] = (mtime, future)
+
+
+def read_excel(path, **kwargs):
+    """Drop-in replacement for pd.read_excel that uses a prefetched result."""
+    future = get(path, **kwargs)
+    if future is None:
+        return pd.read_excel(path, **kwargs)
+    return future.result()
@@ -0,0 +1,90 @@
+"""Chart helpers that stay fast from ~50 states up to ~85,000 tracts.
+
+top_k() selects the k largest rows with np.argpartition (O(n)) instead of
+sorting the whole table, histogram() bins with a fixed number of NumPy bins
+so the drawn artist count doesn't grow with the data, and scatter() shrinks
+and rasterises markers once a plot holds thousands of points. Past
+DENSITY_LARGE points scatter() switches to density(), which bins the points
+into a 2-D histogram at the axes' pixel resolution and draws it as a single
+image, so rendering time and PNG size no longer depend on the point count.
+"""
+import numpy as np
+from matplotlib.colors import LogNorm
+
+SCATTER_LARGE = 2_000
+DENSITY_LARGE = 100_000
+
+
+def top_k(df, col, k=10, largest=True):
+    """Rows of ``df`` with the k largest (or smallest) ``col``, ordered."""
+    values = df[col].to_numpy(dtype=float, na_value=np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return df.iloc[[]]
+
+    keyed = -values[valid] if largest else values[valid]
+    k = min(k, len(valid))
+    part = np.argpartition(keyed, k - 1)[:k]
+    order = part[np.argsort(keyed[part], kind="stable")]
+    return df.iloc[valid[order]]
+
+
+def histogram(values, bins=30, range=None):
+    """Fixed-bin histogram of the finite values; returns (counts, edges)."""
+    v = np.asarray(values, dtype=float)
+    v = v[np.isfinite(v)]
+    if range is None and len(v):
+        range = (v.min(), v.max()) if v.min() < v.max() else (v.min() - 0.5, v.max() + 0.5)
+    return np.histogram(v, bins=bins, range=range)
+
+
+def plot_histogram(ax, values, bins=30, range=None):
+    """Draw a precomputed histogram as a single filled step artist."""
+    counts, edges = histogram(values, bins, range)
+    ax.stairs(counts, edges, fill=True)
+    return counts, edges
+
+
+def density(ax, x, y, bins=None, log=True, cmap="viridis"):
+    """Draw x/y as a 2-D count image instead of individual markers.
+
+    ``bins`` defaults to the axes' size in pixels (capped at 1000 per side).
+    Empty cells stay transparent; ``log`` colours counts on a log scale.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    x, y = x[ok], y[ok]
+
+    if bins is None:
+        bbox = ax.get_window_extent()
+        bins = (int(min(max(bbox.width, 50), 1000)), int(min(max(bbox.height, 50), 1000)))
+    if len(x):
+        xr = (x.min(), x.max()) if x.min() < x.max() else (x.min() - 0.5, x.max() + 0.5)
+        yr = (y.min(), y.max()) if y.min() < y.max() else (y.min() - 0.5, y.max() + 0.5)
+    else:
+        xr = yr = (0, 1)
+    counts, xedges, yedges = np.histogram2d(x, y, bins=bins, range=[xr, yr])
+
+    counts = np.where(counts > 0, counts, np.nan)
+    norm = LogNorm(vmin=1, vmax=max(np.nanmax(counts), 1)) if log and len(x) else None
+    return ax.imshow(counts.T, origin="lower", aspect="auto", interpolation="nearest",
+                     extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]),
+                     cmap=cmap, norm=norm)
+
+
+def scatter(ax, x, y, density_mode=None, **kwargs):
+    """ax.scatter that stays legible and cheap for large point counts.
+
+    ``density_mode`` forces (True) or disables (False) density rendering;
+    by default it switches on above DENSITY_LARGE points.
+    """
+    n = len(x)
+    if density_mode or (density_mode is None and n > DENSITY_LARGE):
+        return density(ax, x, y, cmap=kwargs.get("cmap", "viridis"))
+    if n > SCATTER_LARGE:
+        kwargs.setdefault("s", max(1.0, 36 * (SCATTER_LARGE / n) ** 0.5))
+        kwargs.setdefault("alpha", 0.4)
+        kwargs.setdefault("linewidths", 0)
+        kwargs.setdefault("rasterized", True)
+    return ax.scatter(x, y, **kwargs)
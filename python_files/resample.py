@@ -0,0 +1,215 @@
+"""Multi-resolution resampling and rolling statistics for the macro series.
+
+MultiResolution takes a dated frame (monthly in Housing_Macroeconomic_Factors,
+annual in Annual_Macroeconomic_Factors) and aggregates every numeric column to
+monthly, quarterly, annual and decade means with one np.bincount per column.
+On top of each resolution it computes rolling means, volatility (rolling std
+of period-over-period % change), year-over-year growth and a rolling
+regression of one series on another. All rolling windows come from
+cumulative sums, so each is O(n) whatever the window length, and every
+result is cached per resolution so switching views never recomputes.
+"""
+import numpy as np
+import pandas as pd
+
+# Resolution -> (periods per year, default rolling window in periods)
+RESOLUTIONS = {
+    "Monthly":   (12, 12),
+    "Quarterly": (4, 4),
+    "Annual":    (1, 3),
+    "Decade":    (0.1, 2),
+}
+
+
+def period_codes(dates, resolution):
+    """Integer period code and period start date for every timestamp."""
+    dates = pd.DatetimeIndex(dates)
+    year = dates.year.to_numpy()
+    month = dates.month.to_numpy()
+
+    if resolution == "Monthly":
+        code = year * 12 + (month - 1)
+        start = pd.to_datetime({"year": code // 12, "month": code % 12 + 1, "day": 1})
+    elif resolution == "Quarterly":
+        code = year * 4 + (month - 1) // 3
+        start = pd.to_datetime({"year": code // 4, "month": (code % 4) * 3 + 1, "day": 1})
+    elif resolution == "Annual":
+        code = year
+        start = pd.to_datetime({"year": code, "month": 1, "day": 1})
+    elif resolution == "Decade":
+        code = year // 10 * 10
+        start = pd.to_datetime({"year": code, "month": 1, "day": 1})
+    else:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    return code, pd.DatetimeIndex(start)
+
+
+# ---------------------------------------------------------
+# O(n) rolling windows from cumulative sums
+# ---------------------------------------------------------
+def _window_sums(values, window):
+    """Sum and count of the non-NaN values in each trailing window.
+
+    The first ``window - 1`` windows are partial (they start at the first
+    value), so callers decide with ``counts`` whether they hold enough values.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return csum[end] - csum[start], ccnt[end] - ccnt[start]
+
+
+def rolling_mean(values, window, min_periods=None):
+    """Trailing mean over ``window`` periods; NaN until ``min_periods`` values."""
+    min_periods = window if min_periods is None else min_periods
+    sums, counts = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts >= min_periods, sums / counts, np.nan)
+
+
+def rolling_std(values, window, min_periods=None):
+    """Trailing sample standard deviation over ``window`` periods."""
+    values = np.asarray(values, dtype=float)
+    min_periods = window if min_periods is None else min_periods
+    # Centre first so the sum-of-squares difference doesn't lose precision
+    shifted = values - np.nanmean(values) if np.isfinite(values).any() else values
+    sums, counts = _window_sums(shifted, window)
+    squares, _ = _window_sums(shifted ** 2, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (squares - sums ** 2 / counts) / (counts - 1)
+    var = np.maximum(var, 0.0)
+    return np.where(counts >= max(min_periods, 2), np.sqrt(var), np.nan)
+
+
+def pct_change(values, lag=1):
+    """Percent change against the value ``lag`` periods earlier."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if 0 < lag < len(values):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[lag:] = (values[lag:] / values[:-lag] - 1) * 100
+    return out
+
+
+def rolling_regression(y, x, window):
+    """Rolling OLS of ``y`` on ``x``: (slope, intercept, r2) arrays.
+
+    Pairs with a NaN on either side are left out of the window; the first
+    ``window - 1`` positions (no full window yet) are NaN.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    both = ~(np.isnan(x) | np.isnan(y))
+    # Centre for precision; the intercept is shifted back below
+    mx = x[both].mean() if both.any() else 0.0
+    my = y[both].mean() if both.any() else 0.0
+    x = np.where(both, x - mx, np.nan)
+    y = np.where(both, y - my, np.nan)
+
+    sx, n = _window_sums(x, window)
+    sy, _ = _window_sums(y, window)
+    sxx, _ = _window_sums(x * x, window)
+    syy, _ = _window_sums(y * y, window)
+    sxy, _ = _window_sums(x * y, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx ** 2 / n
+        var_y = syy - sy ** 2 / n
+        slope = cov / var_x
+        intercept = (sy / n + my) - slope * (sx / n + mx)
+        r2 = cov ** 2 / (var_x * var_y)
+
+    ok = (n >= 3) & (var_x > 0) & (np.arange(len(n)) >= window - 1)
+    return (np.where(ok, slope, np.nan), np.where(ok, intercept, np.nan),
+            np.where(ok, r2, np.nan))
+
+
+# ---------------------------------------------------------
+# Engine
+# ---------------------------------------------------------
+class MultiResolution:
+    """Per-resolution aggregates and rolling statistics of a dated frame."""
+
+    def __init__(self, df, date_col="Date", columns=None):
+        df = df.dropna(subset=[date_col]).sort_values(date_col)
+        if columns is None:
+            columns = [c for c in df.columns
+                       if c != date_col and pd.api.types.is_numeric_dtype(df[c])]
+        self.columns = list(columns)
+        self._dates = pd.DatetimeIndex(df[date_col])
+        self._values = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        self._frames = {}
+        self._codes = {}
+        self._rolling = {}
+        self._regressions = {}
+
+    def frame(self, resolution):
+        """Mean of every column per period, indexed by period start date."""
+        if resolution not in self._frames:
+            code, start = period_codes(self._dates, resolution)
+            uniq, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+
+            valid = ~np.isnan(self._values)
+            filled = np.where(valid, self._values, 0.0)
+            means = {}
+            for j, col in enumerate(self.columns):
+                sums = np.bincount(inverse, weights=filled[:, j], minlength=len(uniq))
+                counts = np.bincount(inverse, weights=valid[:, j], minlength=len(uniq))
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    means[col] = sums / counts
+
+            index = pd.DatetimeIndex(start[first], name="Period")
+            self._frames[resolution] = pd.DataFrame(means, index=index)
+            self._codes[resolution] = uniq
+        return self._frames[resolution]
+
+    def _period_positions(self, resolution):
+        """Position of each observed period on the complete period range."""
+        self.frame(resolution)
+        code = self._codes[resolution]
+        step = 10 if resolution == "Decade" else 1
+        return (code - code[0]) // step if len(code) else code
+
+    def rolling(self, resolution, window=None):
+        """Rolling mean, volatility and YoY growth for every column.
+
+        Columns are named ``<col>_mean``, ``<col>_vol`` and ``<col>_yoy``.
+        Changes are taken against the calendar period ``lag`` periods back
+        (a missing period gives NaN), not the previous observed row.
+        """
+        per_year, default_window = RESOLUTIONS[resolution]
+        window = window or default_window
+        key = (resolution, window)
+        if key not in self._rolling:
+            frame = self.frame(resolution)
+            # Decades have no year-over-year change; compare with the previous one
+            lag = max(1, int(per_year))
+            pos = self._period_positions(resolution)
+            n_full = int(pos[-1]) + 1 if len(pos) else 0
+            out = {}
+            for col in self.columns:
+                values = frame[col].to_numpy()
+                # Spread onto the complete period range so gaps stay gaps
+                full = np.full(n_full, np.nan)
+                full[pos] = values
+                out[f"{col}_mean"] = rolling_mean(values, window)
+                out[f"{col}_vol"] = rolling_std(pct_change(full, 1), window)[pos]
+                out[f"{col}_yoy"] = pct_change(full, lag)[pos]
+            self._rolling[key] = pd.DataFrame(out, index=frame.index)
+        return self._rolling[key]
+
+    def regression(self, resolution, y, x, window=None):
+        """Rolling regression of column ``y`` on column ``x`` (slope, intercept, r2)."""
+        window = window or RESOLUTIONS[resolution][1]
+        key = (resolution, y, x, window)
+        if key not in self._regressions:
+            frame = self.frame(resolution)
+            slope, intercept, r2 = rolling_regression(frame[y].to_numpy(),
+                                                      frame[x].to_numpy(), window)
+            self._regressions[key] = pd.DataFrame(
+                {"slope": slope, "intercept": intercept, "r2": r2}, index=frame.index)
+        return self._regressions[key]
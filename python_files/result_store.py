@@ -0,0 +1,143 @@
+"""Local, versioned store of module results shared by the worker and the app.
+
+The background worker (python_files/worker.py) publishes each module's
+recorded output as ``output/.results/<module>/v<N>.pkl`` and then atomically
+replaces ``latest.json`` to point at it, so a reader never sees a half
+written result. ``latest.json`` also names the last good version, which is
+kept on disk, so a failed or timed-out run never hides the previous output. The app only reads from here. Requests go the other way as
+empty files in ``queue/`` (a file-based queue), and the worker keeps a
+heartbeat file so the app can tell whether it is running.
+"""
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+STORE_DIR = os.path.join("output", ".results")
+QUEUE_DIR = os.path.join(STORE_DIR, "queue")
+HEARTBEAT = os.path.join(STORE_DIR, "worker.heartbeat")
+LOCK_FILE = os.path.join(STORE_DIR, "worker.lock")
+LOG_FILE = os.path.join(STORE_DIR, "worker.log")
+KEEP_VERSIONS = 3
+
+
+def _atomic_write(path, data, mode="w"):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _module_dir(module):
+    return os.path.join(STORE_DIR, module)
+
+
+# ---------------------------------------------------------
+# Results
+# ---------------------------------------------------------
+def latest_info(module):
+    """Metadata of the newest published result, or None."""
+    try:
+        with open(os.path.join(_module_dir(module), "latest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publish(module, result):
+    """Store ``result`` as the next version of ``module``; returns the version."""
+    os.makedirs(_module_dir(module), exist_ok=True)
+    previous = latest_info(module)
+    version = previous["version"] + 1 if previous else 1
+
+    fname = f"v{version}.pkl"
+    _atomic_write(os.path.join(_module_dir(module), fname),
+                  pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), "wb")
+    # A failed run doesn't replace the last good result, it is shown next to it
+    good = version if result["ok"] else (previous or {}).get("good_version")
+    info = {
+        "version": version,
+        "file": fname,
+        "ok": result["ok"],
+        "status": result.get("status", "ok" if result["ok"] else "error"),
+        "error": None if result["ok"] else result["error"],
+        "good_version": good,
+        "seconds": result["seconds"],
+        "finished": result["finished"],
+    }
+    _atomic_write(os.path.join(_module_dir(module), "latest.json"), json.dumps(info))
+
+    # Old versions are only kept briefly for readers still holding them.
+    for name in os.listdir(_module_dir(module)):
+        if name.startswith("v") and name.endswith(".pkl"):
+            old = int(name[1:-4])
+            if old <= version - KEEP_VERSIONS and old != good:
+                os.remove(os.path.join(_module_dir(module), name))
+    return version
+
+
+def load(module, version):
+    """Load a published result (records, ok, error, seconds, version)."""
+    with open(os.path.join(_module_dir(module), f"v{version}.pkl"), "rb") as f:
+        result = pickle.load(f)
+    result["version"] = version
+    return result
+
+
+# ---------------------------------------------------------
+# Request queue
+# ---------------------------------------------------------
+def request(module):
+    """Ask the worker to recompute ``module``."""
+    os.makedirs(QUEUE_DIR, exist_ok=True)
+    _atomic_write(os.path.join(QUEUE_DIR, f"{module}.request"), str(time.time()))
+
+
+def take_requests():
+    """Pop every pending request; returns the module names."""
+    if not os.path.isdir(QUEUE_DIR):
+        return []
+    modules = []
+    for name in os.listdir(QUEUE_DIR):
+        if name.endswith(".request"):
+            try:
+                os.remove(os.path.join(QUEUE_DIR, name))
+            except FileNotFoundError:
+                continue
+            modules.append(name[:-len(".request")])
+    return modules
+
+
+# ---------------------------------------------------------
+# Worker liveness
+# ---------------------------------------------------------
+def beat():
+    os.makedirs(STORE_DIR, exist_ok=True)
+    _atomic_write(HEARTBEAT, json.dumps({"pid": os.getpid(), "time": time.time()}))
+
+
+def worker_alive(max_age=15):
+    try:
+        with open(HEARTBEAT) as f:
+            return time.time() - json.load(f)["time"] < max_age
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def ensure_worker():
+    """Start the background worker if no live heartbeat is found.
+
+    The worker holds an exclusive lock, so a duplicate started by a racing
+    session exits immediately.
+    """
+    if worker_alive():
+        return False
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with open(LOG_FILE, "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "python_files.worker"],
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+    return True
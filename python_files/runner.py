@@ -0,0 +1,166 @@
+"""Run a module's main() off the Streamlit script thread and replay its output.
+
+The modules talk to Streamlit through their module-level ``st``. run_module()
+swaps that for a Recorder, which logs every call (figures are rendered to PNG
+bytes straight away), so main() can run in a background thread or another
+process. replay() later re-issues the recorded calls against the real
+Streamlit API, including the contents of tabs, columns and expanders.
+"""
+import io
+import threading
+import time
+import traceback
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+# Containers whose contents are recorded as nested blocks.
+_CONTAINERS = {"tabs", "columns", "expander", "container"}
+
+# Widgets can't be replayed; inside a recorded run they return their default.
+_WIDGETS = {"selectbox", "radio", "slider", "select_slider", "checkbox", "toggle",
+            "text_input", "number_input", "multiselect", "button"}
+
+# Calls that only make sense once per page.
+_IGNORED = {"set_page_config", "rerun", "stop"}
+
+# matplotlib's pyplot state is global, so recorded runs take turns.
+_lock = threading.Lock()
+
+
+class _Block:
+    """A recorded container: ``with block:`` or ``block.write(...)``."""
+
+    def __init__(self, recorder):
+        self._recorder = recorder
+        self.records = []
+
+    def __enter__(self):
+        self._recorder._stack.append(self.records)
+        return self
+
+    def __exit__(self, *exc):
+        self._recorder._stack.pop()
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(self._recorder, name)
+
+        def call(*args, **kwargs):
+            with self:
+                return method(*args, **kwargs)
+        return call
+
+
+class Recorder:
+    """Stand-in for the ``streamlit`` module that records calls for replay."""
+
+    def __init__(self):
+        self.records = []
+        self._stack = [self.records]
+
+    def _emit(self, name, *args, **kwargs):
+        self._stack[-1].append((name, args, kwargs))
+
+    def pyplot(self, fig=None, **kwargs):
+        fig = fig if fig is not None else plt.gcf()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        plt.close(fig)
+        self._emit("image", buf.getvalue())
+
+    def _blocks(self, kind, n, *args, **kwargs):
+        blocks = [_Block(self) for _ in range(n)]
+        self._emit(kind, *args, children=[b.records for b in blocks], **kwargs)
+        return blocks
+
+    def tabs(self, labels):
+        return self._blocks("tabs", len(labels), list(labels))
+
+    def columns(self, spec, **kwargs):
+        n = spec if isinstance(spec, int) else len(spec)
+        return self._blocks("columns", n, spec, **kwargs)
+
+    def expander(self, label, **kwargs):
+        return self._blocks("expander", 1, label, **kwargs)[0]
+
+    def container(self, **kwargs):
+        return self._blocks("container", 1, **kwargs)[0]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            if name in _WIDGETS:
+                return _widget_default(name, args, kwargs)
+            if name not in _IGNORED:
+                self._emit(name, *args, **kwargs)
+        return call
+
+
+def _widget_default(name, args, kwargs):
+    options = kwargs.get("options", args[1] if len(args) > 1 else None)
+    if name in ("selectbox", "radio"):
+        options = list(options or [])
+        return options[kwargs.get("index", 0)] if options else None
+    if name == "multiselect":
+        return kwargs.get("default", [])
+    if name in ("checkbox", "toggle"):
+        return kwargs.get("value", False)
+    if name == "button":
+        return False
+    return kwargs.get("value", args[1] if len(args) > 1 and name != "select_slider" else None)
+
+
+def run_module(module):
+    """Run ``module.main()`` with a Recorder in place of ``st``.
+
+    Returns a result dict: records, ok, error (traceback text or None),
+    seconds and finished (timestamp).
+    """
+    recorder = Recorder()
+    start = time.time()
+    error = None
+
+    with _lock:
+        original = getattr(module, "st", None)
+        module.st = recorder
+        try:
+            module.main()
+        except Exception:
+            error = traceback.format_exc()
+        finally:
+            if original is not None:
+                module.st = original
+            plt.close("all")
+
+    return {
+        "records": recorder.records,
+        "ok": error is None,
+        "error": error,
+        "seconds": time.time() - start,
+        "finished": time.time(),
+    }
+
+
+def replay(records, st=None):
+    """Re-issue recorded calls against Streamlit (or any ``st``-like target)."""
+    if st is None:
+        import streamlit as st
+
+    for name, args, kwargs in records:
+        if name == "image":
+            st.image(args[0])
+        elif name in _CONTAINERS:
+            kwargs = dict(kwargs)
+            children = kwargs.pop("children")
+            made = getattr(st, name)(*args, **kwargs)
+            made = made if isinstance(made, (list, tuple)) else [made]
+            for container, child in zip(made, children):
+                with container:
+                    replay(child, st)
+        else:
+            getattr(st, name)(*args, **kwargs)
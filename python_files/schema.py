@@ -0,0 +1,236 @@
+"""Declarative schemas for the input sheets and a vectorised validator.
+
+Each dataset is described once in SCHEMAS: column types, value ranges,
+nullability, uniqueness, monotonic ordering and allowed categories.
+compile_schema() turns a schema into per-column lists of checks, and validate()
+converts each column once and evaluates all of its checks as NumPy masks in
+a single pass over the frame.
+
+Two modes are supported:
+    mode="report"     run every check and collect counts + sample rows
+    mode="fail_fast"  raise SchemaError at the first failing check
+"""
+import numpy as np
+import pandas as pd
+
+YES_NO = ["yes", "no"]
+PERCENT = {"type": "number", "min": 0, "max": 100}
+
+SCHEMAS = {
+    "housing": {
+        "price":            {"type": "number", "min": 0},
+        "area":             {"type": "number", "min": 0},
+        "bedrooms":         {"type": "integer", "min": 0},
+        "bathrooms":        {"type": "integer", "min": 0},
+        "stories":          {"type": "integer", "min": 0},
+        "parking":          {"type": "integer", "min": 0},
+        "mainroad":         {"type": "category", "allowed": YES_NO},
+        "guestroom":        {"type": "category", "allowed": YES_NO},
+        "basement":         {"type": "category", "allowed": YES_NO},
+        "hotwaterheating":  {"type": "category", "allowed": YES_NO},
+        "airconditioning":  {"type": "category", "allowed": YES_NO},
+        "prefarea":         {"type": "category", "allowed": YES_NO},
+        "furnishingstatus": {"type": "category",
+                             "allowed": ["furnished", "semi-furnished", "unfurnished"]},
+    },
+    "annual_macro": {
+        "Date":                   {"type": "datetime", "nullable": False,
+                                   "unique": True, "monotonic": "increasing"},
+        "House_Price_Index":      {"type": "number", "min": 0},
+        "Mortgage_Rate":          PERCENT,
+        "Unemployment_Rate":      PERCENT,
+        "Real_Disposable_Income": {"type": "number", "min": 0},
+    },
+    "housing_macro": {
+        "Date":              {"type": "datetime", "nullable": False,
+                              "unique": True, "monotonic": "increasing"},
+        "house_price_index": {"type": "number", "min": 0},
+        "mortgage_rate":     PERCENT,
+        "gdp":               {"type": "number", "min": 0},
+        "employment_rate":   PERCENT,
+    },
+    "regional_cost_of_living": {
+        "Year":                           {"type": "integer", "nullable": False, "min": 1901},
+        "Average_Monthly_Income":         {"type": "number", "min": 0},
+        "Cost_of_Living":                 {"type": "number", "min": 0},
+        "Housing_Cost_Percentage":        PERCENT,
+        "Tax_Rate":                       PERCENT,
+        "Healthcare_Cost_Percentage":     PERCENT,
+        "Education_Cost_Percentage":      PERCENT,
+        "Transportation_Cost_Percentage": PERCENT,
+    },
+    "homeless_years": {
+        "year":             {"type": "integer", "nullable": False,
+                             "unique": True, "monotonic": "increasing"},
+        "Overall Homeless": {"type": "number", "min": 0},
+    },
+    "population": {
+        "Name":     {"type": "string", "nullable": False},
+        "FIPS":     {"type": "string", "unique": True},
+        "Pop_1990": {"type": "number", "min": 0},
+        "Pop_2000": {"type": "number", "min": 0},
+        "Pop_2010": {"type": "number", "min": 0},
+        "Pop_2020": {"type": "number", "min": 0},
+        "Pop_2023": {"type": "number", "min": 0},
+    },
+    "poverty": {
+        # County names repeat across states, so uniqueness is on the code
+        "Name":                 {"type": "string", "nullable": False},
+        "FIPS":                 {"type": "string", "unique": True},
+        "All_Poverty_Pct":      PERCENT,
+        "All_Lower_Bound":      PERCENT,
+        "All_Upper_Bound":      PERCENT,
+        "Children_Poverty_Pct": PERCENT,
+        "Children_Lower_Bound": PERCENT,
+        "Children_Upper_Bound": PERCENT,
+    },
+    "unemployment": {
+        "Name":             {"type": "string", "nullable": False},
+        "FIPS":             {"type": "string", "unique": True},
+        "Unemployment_Pct": {**PERCENT, "nullable": False},
+    },
+}
+
+
+class SchemaError(ValueError):
+    """Raised by validate(mode="fail_fast") on the first violation."""
+
+
+class ValidationReport:
+    """Outcome of validate(): missing columns, per-rule counts and row masks."""
+
+    def __init__(self, n_rows, missing, violations, masks):
+        self.n_rows = n_rows
+        self.missing = missing
+        self.violations = violations  # DataFrame: column, rule, count, sample_rows
+        self._masks = masks           # {column: bool array of rows violating it}
+
+    @property
+    def ok(self):
+        return not self.missing and self.violations["count"].sum() == 0
+
+    def row_mask(self, columns=None):
+        """Boolean mask of rows that pass every check on ``columns`` (all by default)."""
+        keep = np.ones(self.n_rows, dtype=bool)
+        for col, bad in self._masks.items():
+            if columns is None or col in columns:
+                keep &= ~bad
+        return keep
+
+
+# ---------------------------------------------------------
+# Compilation: schema -> {column: [(rule, check)]}
+# ---------------------------------------------------------
+def _convert(series, kind):
+    """Convert once per column; returns (values, type_violation_mask)."""
+    present = series.notna().to_numpy()
+
+    if kind in ("number", "integer"):
+        values = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors="coerce")
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+        bad = present & np.isnan(values)
+        if kind == "integer":
+            bad |= ~np.isnan(values) & (np.floor(values) != values)
+        return values, bad
+
+    if kind == "datetime":
+        values = series if pd.api.types.is_datetime64_any_dtype(series) else pd.to_datetime(series, errors="coerce")
+        values = values.to_numpy(dtype="datetime64[ns]")
+        return values, present & np.isnat(values)
+
+    # string / category: factorised once, so later checks work on integer codes
+    codes, uniques = pd.factorize(series)
+    values = pd.Categorical.from_codes(codes, pd.Index(uniques).astype(str))
+    return values, np.zeros(len(series), dtype=bool)
+
+
+def _is_null(values):
+    if isinstance(values, pd.Categorical):
+        return values.codes == -1
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype.kind == "M":
+        return np.isnat(values)
+    return pd.isna(values)
+
+
+def _allowed(values, allowed):
+    """Mask of values outside ``allowed``, testing each distinct value once."""
+    bad = np.array([u.strip() not in allowed for u in values.categories] + [False])
+    return bad[values.codes]  # code -1 (null) indexes the trailing False
+
+
+def compile_schema(schema):
+    """Turn a column spec dict into {column: [(rule, check_fn), ...]}.
+
+    Every check_fn takes the converted column values and their null mask and
+    returns a boolean array of violating rows.
+    """
+    compiled = {}
+
+    for col, spec in schema.items():
+        checks = compiled[col] = []
+        if not spec.get("nullable", True):
+            checks.append(("not_null", lambda v, null: null))
+        if "min" in spec:
+            lo = spec["min"]
+            checks.append((f"min={lo}", lambda v, null, lo=lo: ~null & (v < lo)))
+        if "max" in spec:
+            hi = spec["max"]
+            checks.append((f"max={hi}", lambda v, null, hi=hi: ~null & (v > hi)))
+        if "allowed" in spec:
+            checks.append(("allowed", lambda v, null, a=spec["allowed"]: ~null & _allowed(v, a)))
+        if spec.get("unique"):
+            checks.append(("unique",
+                           lambda v, null: ~null & pd.Series(v).duplicated(keep=False).to_numpy()))
+        if spec.get("monotonic") == "increasing":
+            def decreasing(v, null):
+                bad = np.zeros(len(v), dtype=bool)
+                if (~null).sum() > 1:
+                    # Compare each value with the running max of the rows above it.
+                    filled = v[~null]
+                    prev_max = np.maximum.accumulate(filled)[:-1]
+                    bad_filled = np.concatenate([[False], filled[1:] < prev_max])
+                    bad[~null] = bad_filled
+                return bad
+            checks.append(("monotonic_increasing", decreasing))
+
+    return compiled
+
+
+# ---------------------------------------------------------
+# Validation
+# ---------------------------------------------------------
+def validate(df, schema, mode="report", sample_size=5):
+    """Validate ``df`` against ``schema`` (a SCHEMAS key or a spec dict)."""
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+
+    missing = [col for col in schema if col not in df.columns]
+    if missing and mode == "fail_fast":
+        raise SchemaError(f"Missing required columns: {missing}")
+
+    compiled = compile_schema({c: s for c, s in schema.items() if c in df.columns})
+    masks = {}
+    rows = []
+    index = df.index.to_numpy()
+
+    def record(col, rule, bad):
+        count = int(bad.sum())
+        if count and mode == "fail_fast":
+            raise SchemaError(f'Column "{col}" failed {rule} on {count} rows '
+                              f"(e.g. rows {index[bad][:sample_size].tolist()})")
+        masks[col] = masks.get(col, np.zeros(len(df), dtype=bool)) | bad
+        rows.append({"column": col, "rule": rule, "count": count,
+                     "sample_rows": index[bad][:sample_size].tolist()})
+
+    for col, checks in compiled.items():
+        kind = schema[col].get("type", "string")
+        values, type_bad = _convert(df[col], kind)
+        null = _is_null(values)
+        record(col, f"type={kind}", type_bad)
+        for rule, check in checks:
+            record(col, rule, check(values, null))
+
+    violations = pd.DataFrame(rows, columns=["column", "rule", "count", "sample_rows"])
+    return ValidationReport(len(df), missing, violations, masks)
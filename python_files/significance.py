@@ -0,0 +1,109 @@
+"""Pairwise significance of estimate differences from their 90% bounds.
+
+The poverty estimates come with 90% confidence bounds, so each standard
+error is SE = (UB - LB) / (2 * 1.645). Two areas differ significantly (at
+90%) when |x_i - x_j| > 1.645 * sqrt(SE_i^2 + SE_j^2), the test the Census
+Bureau uses for its own comparisons.
+
+significance_matrix() runs that test for every pair as one n x n broadcast.
+For county-level data (n ~ 3,200, ~10M pairs) pair_counts() computes the
+same comparisons in row blocks that fit in BLOCK_ELEMENTS, keeping only
+per-area counts. rank_table() turns the counts into a ranking with a
+significance-aware range: an area can rank no higher than one plus the
+number of areas significantly above it, and no lower than n minus the
+number significantly below it.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+LEVEL = 0.90
+BLOCK_ELEMENTS = 4_000_000
+
+
+def critical_value(level=LEVEL):
+    """Two-sided normal critical value (1.645 for 90%)."""
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+def standard_errors(lower, upper, level=LEVEL):
+    """Standard errors from confidence bounds at ``level``."""
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    return (upper - lower) / (2 * critical_value(level))
+
+
+def significance_matrix(estimates, se, level=LEVEL):
+    """n x n int8 matrix: +1 where row i is significantly above column j,
+    -1 where it is significantly below, 0 otherwise (or when missing)."""
+    x = np.asarray(estimates, dtype=float)
+    var = np.asarray(se, dtype=float) ** 2
+    diff = x[:, None] - x[None, :]
+    threshold = critical_value(level) * np.sqrt(var[:, None] + var[None, :])
+    with np.errstate(invalid="ignore"):
+        return (np.sign(diff) * (np.abs(diff) > threshold)).astype(np.int8)
+
+
+def pair_counts(estimates, se, level=LEVEL, block_elements=BLOCK_ELEMENTS):
+    """Per area: (number of areas it is significantly above, below).
+
+    The n x n comparisons run in row blocks of at most ``block_elements``
+    pairs; areas with a missing estimate or SE are compared with nobody.
+    """
+    x = np.asarray(estimates, dtype=float)
+    var = np.asarray(se, dtype=float) ** 2
+    ok = ~(np.isnan(x) | np.isnan(var))
+    above = np.zeros(len(x), dtype=np.int64)
+    below = np.zeros(len(x), dtype=np.int64)
+    xv, vv = x[ok], var[ok]
+    n = len(xv)
+    if n == 0:
+        return above, below
+
+    # Compare squared quantities: no sqrt over the n x n block
+    z2 = critical_value(level) ** 2
+    step = max(1, block_elements // n)
+    a = np.empty(n, dtype=np.int64)
+    b = np.empty(n, dtype=np.int64)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        diff = xv[start:stop, None] - xv[None, :]
+        sig = diff * diff > z2 * (vv[start:stop, None] + vv[None, :])
+        a[start:stop] = np.count_nonzero(sig & (diff > 0), axis=1)
+        b[start:stop] = np.count_nonzero(sig & (diff < 0), axis=1)
+    above[ok], below[ok] = a, b
+    return above, below
+
+
+def rank_table(df, name_col, estimate, lower, upper, level=LEVEL, prefix=None, sort=True):
+    """Ranking (1 = highest estimate) with its significance-aware range.
+
+    Columns: name, estimate, SE, Rank, Rank_Min, Rank_Max and the number of
+    areas it is significantly higher / lower than, prefixed with ``prefix``.
+    With ``sort=False`` the rows stay in the order of ``df``.
+    """
+    prefix = f"{prefix}_" if prefix else ""
+    x = pd.to_numeric(df[estimate], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    se = standard_errors(pd.to_numeric(df[lower], errors="coerce"),
+                         pd.to_numeric(df[upper], errors="coerce"), level)
+    above, below = pair_counts(x, se, level)
+    valid = ~(np.isnan(x) | np.isnan(se))
+    n = int(np.count_nonzero(valid))
+
+    ranks = pd.Series(np.where(valid, x, np.nan)).rank(ascending=False, method="min").to_numpy()
+    table = pd.DataFrame({
+        name_col: df[name_col].to_numpy(),
+        estimate: x,
+        f"{prefix}SE": se,
+        f"{prefix}Rank": ranks,
+        # Every area significantly higher must rank ahead, every one
+        # significantly lower behind
+        f"{prefix}Rank_Min": np.where(valid, 1 + below, np.nan),
+        f"{prefix}Rank_Max": np.where(valid, n - above, np.nan),
+        f"{prefix}Sig_Higher_Than": above,
+        f"{prefix}Sig_Lower_Than": below,
+    })
+    if not sort:
+        return table
+    return table.sort_values(f"{prefix}Rank", kind="stable").reset_index(drop=True)
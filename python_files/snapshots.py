@@ -0,0 +1,228 @@
+"""Append-only, content-hashed snapshot store for the cleaned tables.
+
+Each commit() of a table becomes an immutable version. Rows are spread over
+a fixed number of buckets by a hash of their key (e.g. the state name), and
+every bucket is stored once under the SHA-256 of its content:
+
+    output/snapshots/<dataset>/objects/<hash>.feather
+    output/snapshots/<dataset>/versions/v000001.json
+
+A version file just maps bucket -> object hash, so a new version only
+writes the buckets whose rows changed; everything else is shared with
+earlier versions. read() rebuilds any version (or the newest one as of a
+date) from its objects, and diff() only opens the buckets whose hashes
+differ between two versions.
+"""
+import hashlib
+import json
+import os
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from python_files import storage
+
+SNAPSHOT_DIR = os.path.join(storage.OUT_DIR, "snapshots")
+N_BUCKETS = 16
+# Preferred row keys, most specific first (county names repeat across states)
+KEY_CANDIDATES = (["FIPS"], ["Name", "State"], ["Name"])
+ROW_KEY = "_row"
+
+
+def _dataset_dir(dataset, root):
+    return os.path.join(root, dataset)
+
+
+def _objects_dir(dataset, root):
+    return os.path.join(root, dataset, "objects")
+
+
+def _versions_dir(dataset, root):
+    return os.path.join(root, dataset, "versions")
+
+
+def _keys(key):
+    return [key] if isinstance(key, str) else list(key)
+
+
+def _buckets(df, key, n_buckets):
+    hashed = pd.util.hash_pandas_object(df[_keys(key)], index=False).to_numpy()
+    return hashed % np.uint64(n_buckets)
+
+
+def unique_key(df, candidates=KEY_CANDIDATES):
+    """First candidate key that exists in ``df`` and identifies every row, or None."""
+    for key in candidates:
+        if all(c in df.columns for c in key):
+            if not df[key].isna().any().any() and not df.duplicated(key).any():
+                return list(key)
+    return None
+
+
+def _content_hash(part):
+    """SHA-256 of a partition's columns, dtypes and row hashes."""
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in part.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+# Versions
+# ---------------------------------------------------------
+def versions(dataset, root=SNAPSHOT_DIR):
+    """All versions of ``dataset`` (version, created, rows, changed, note)."""
+    vdir = _versions_dir(dataset, root)
+    rows = []
+    if os.path.isdir(vdir):
+        for name in sorted(os.listdir(vdir)):
+            if name.endswith(".json"):
+                info = load_version(dataset, int(name[1:-5]), root)
+                rows.append({k: info[k] for k in ("version", "created", "rows", "changed", "note")})
+    return pd.DataFrame(rows, columns=["version", "created", "rows", "changed", "note"])
+
+
+def load_version(dataset, version, root=SNAPSHOT_DIR):
+    path = os.path.join(_versions_dir(dataset, root), f"v{version:06d}.json")
+    if not os.path.exists(path):
+        raise ValueError(f"{dataset} has no version {version}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve(dataset, version=None, as_of=None, root=SNAPSHOT_DIR):
+    """Version number for an explicit version, an ``as_of`` date, or the latest."""
+    history = versions(dataset, root)
+    if history.empty:
+        raise ValueError(f"No snapshots of {dataset} yet")
+    if version is not None:
+        return int(version)
+    if as_of is not None:
+        created = pd.to_datetime(history["created"])
+        history = history[created <= pd.Timestamp(as_of)]
+        if history.empty:
+            raise ValueError(f"No snapshot of {dataset} as of {as_of}")
+    return int(history["version"].iloc[-1])
+
+
+# ---------------------------------------------------------
+# Write
+# ---------------------------------------------------------
+def commit(df, dataset, key, note=None, root=SNAPSHOT_DIR, n_buckets=N_BUCKETS):
+    """Store ``df`` as the next version of ``dataset``; returns its version info.
+
+    Nothing new is written when the content equals the latest version.
+    When ``key`` is None or not unique (see unique_key()) the rows are keyed
+    by position, in a ``_row`` column, with a warning.
+    """
+    keys = None if key is None else _keys(key)
+    if keys is None or df[keys].isna().any().any() or df.duplicated(keys).any():
+        # No usable key: rows are matched by position instead
+        warnings.warn(f"Snapshot key {keys} does not identify every row of {dataset}; "
+                      f"storing it by row position")
+        df = df.assign(**{ROW_KEY: np.arange(len(df))})
+        keys = [ROW_KEY]
+
+    df = df.sort_values(keys, kind="stable").reset_index(drop=True)
+    buckets = _buckets(df, keys, n_buckets)
+    odir = _objects_dir(dataset, root)
+    os.makedirs(odir, exist_ok=True)
+    os.makedirs(_versions_dir(dataset, root), exist_ok=True)
+
+    partitions = {}
+    for b in np.unique(buckets):
+        part = df[buckets == b].reset_index(drop=True)
+        digest = _content_hash(part)
+        if not os.path.exists(storage.table_path(digest, odir)):
+            storage.save_table(part, digest, odir, formats=("feather",))
+        partitions[str(int(b))] = digest
+
+    history = versions(dataset, root)
+    parent = None
+    if not history.empty:
+        parent = load_version(dataset, int(history["version"].iloc[-1]), root)
+        if (parent["partitions"] == partitions and parent["columns"] == list(df.columns)
+                and parent["key"] == keys):
+            return parent
+
+    changed = sorted(b for b, h in partitions.items()
+                     if parent is None or parent["partitions"].get(b) != h)
+    info = {
+        "version": parent["version"] + 1 if parent else 1,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "key": keys,
+        "columns": list(df.columns),
+        "rows": len(df),
+        "n_buckets": n_buckets,
+        "partitions": partitions,
+        "changed": len(changed),
+        "note": note,
+    }
+    # "x" mode: two writers racing for the same version number can't both win
+    path = os.path.join(_versions_dir(dataset, root), f"v{info['version']:06d}.json")
+    with open(path, "x") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+# ---------------------------------------------------------
+# Read
+# ---------------------------------------------------------
+def _read_buckets(dataset, info, buckets, root):
+    odir = _objects_dir(dataset, root)
+    parts = [storage.load_table(info["partitions"][b], odir) for b in buckets]
+    if not parts:
+        return pd.DataFrame(columns=info["columns"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def read(dataset, version=None, as_of=None, root=SNAPSHOT_DIR):
+    """The table as of ``version`` / date ``as_of`` (default: latest)."""
+    info = load_version(dataset, resolve(dataset, version, as_of, root), root)
+    df = _read_buckets(dataset, info, sorted(info["partitions"], key=int), root)
+    return df.sort_values(info["key"], kind="stable").reset_index(drop=True)
+
+
+def diff(dataset, old, new=None, columns=None, root=SNAPSHOT_DIR):
+    """Rows that differ between versions ``old`` and ``new`` (default latest).
+
+    Returns the key columns, ``change`` ("added", "removed" or "changed")
+    and ``<col>_old`` / ``<col>_new`` (plus ``<col>_delta`` for numbers)
+    for each compared column. Only buckets whose hashes differ are read,
+    unless the versions were stored under different keys.
+    """
+    a = load_version(dataset, resolve(dataset, old, root=root), root)
+    b = load_version(dataset, resolve(dataset, new, root=root), root)
+    keys = b["key"]
+    if not set(keys) <= set(a["columns"]) | set(a["key"]):
+        raise ValueError(f"Version {a['version']} has no {keys} columns to compare on")
+
+    buckets = sorted(set(a["partitions"]) | set(b["partitions"]), key=int)
+    if a["key"] == keys and a["n_buckets"] == b["n_buckets"]:
+        touched = [k for k in buckets if a["partitions"].get(k) != b["partitions"].get(k)]
+    else:
+        touched = buckets  # rows sit in different buckets: compare everything
+    left = _read_buckets(dataset, a, [k for k in touched if k in a["partitions"]], root)
+    right = _read_buckets(dataset, b, [k for k in touched if k in b["partitions"]], root)
+
+    if columns is None:
+        columns = [c for c in b["columns"] if c not in keys and c in a["columns"]]
+    merged = left[keys + columns].merge(right[keys + columns], on=keys, how="outer",
+                                        suffixes=("_old", "_new"), indicator=True)
+
+    differs = np.zeros(len(merged), dtype=bool)
+    for c in columns:
+        o, n = merged[f"{c}_old"], merged[f"{c}_new"]
+        differs |= ~((o == n).fillna(False).to_numpy(dtype=bool) | (o.isna() & n.isna()).to_numpy())
+        if pd.api.types.is_numeric_dtype(o) and pd.api.types.is_numeric_dtype(n):
+            merged[f"{c}_delta"] = n - o
+
+    merged["change"] = merged["_merge"].map(
+        {"left_only": "removed", "right_only": "added", "both": "changed"}).astype(str)
+    merged = merged[differs | (merged["_merge"] != "both")]
+
+    ordered = keys + ["change"] + [f"{c}_{s}" for c in columns for s in ("old", "new", "delta")
+                                    if f"{c}_{s}" in merged.columns]
+    return merged[ordered].sort_values(keys, kind="stable").reset_index(drop=True)
@@ -0,0 +1,180 @@
+"""In-process SQL over every cleaned table in ``output/``.
+
+Each cleaned table is registered with an embedded DuckDB connection as a
+pyarrow dataset over its Feather file(s), so DuckDB's vectorised engine
+pushes projections and filters straight into the Arrow scan. The tables are:
+- the flat ``<name>.feather`` tables
+- the partitioned and incremental datasets in ``<name>/``, via their manifest
+
+Results are cached by the normalised query text plus the modification
+times of the tables the query mentions, so an unchanged question is
+answered from memory until one of its inputs is rewritten.
+
+CLI:  python -m python_files.sql "SELECT * FROM Poverty_Clean LIMIT 5"
+      python -m python_files.sql --tables
+"""
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+import duckdb
+import pyarrow.dataset as ds
+import streamlit as st
+
+from python_files import storage
+
+CACHE_SIZE = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+# Quoted strings/identifiers, -- comments, /* */ comments, or anything else
+_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(--[^\n]*|/\*.*?\*/)|([^'"/-]+|[/-])""",
+                     re.S)
+
+
+def catalog(out_dir=storage.OUT_DIR):
+    """{table name: list of Feather files} for every cleaned table."""
+    tables = {}
+    if not os.path.isdir(out_dir):
+        return tables
+    for name in sorted(os.listdir(out_dir)):
+        manifest = os.path.join(out_dir, name, storage.MANIFEST)
+        if os.path.exists(manifest):
+            parts = storage.load_manifest(name, out_dir)["partitions"]
+            tables[name] = [os.path.join(out_dir, name, p["path"]) for p in parts]
+    # A flat file wins over a partitioned copy of the same table
+    for name in storage.list_tables(out_dir):
+        if os.path.exists(storage.table_path(name, out_dir)):
+            tables[name] = [storage.table_path(name, out_dir)]
+    return tables
+
+
+def normalize(query):
+    """Query text with comments removed and whitespace collapsed.
+
+    String literals and quoted identifiers are kept exactly as written.
+    """
+    out = []
+    for quoted, comment, other in _TOKENS.findall(query):
+        if quoted:
+            out.append(quoted)
+        elif other:
+            out.append(re.sub(r"\s+", " ", other))
+    return "".join(out).strip().rstrip(";").strip()
+
+
+def referenced_tables(query, tables):
+    """Catalog tables whose name appears as a word in ``query``."""
+    return [t for t in tables if re.search(rf"(?<![\w.]){re.escape(t)}(?!\w)", query, re.I)]
+
+
+def _version(paths):
+    return max(os.path.getmtime(p) for p in paths)
+
+
+def connect(tables):
+    """A DuckDB connection with ``tables`` registered and no file access."""
+    con = duckdb.connect(config={"enable_external_access": False})
+    for name, paths in tables.items():
+        con.register(name, ds.dataset(paths, format="ipc"))
+    return con
+
+
+def query(text, out_dir=storage.OUT_DIR, use_cache=True):
+    """Run a SQL query over the cleaned tables; returns a DataFrame.
+
+    The query can only read the registered tables: file-system access
+    (COPY, read_csv, ATTACH, ...) is disabled.
+    """
+    normalized = normalize(text)
+    if not normalized:
+        raise ValueError("Empty query")
+
+    tables = catalog(out_dir)
+    used = {t: tables[t] for t in referenced_tables(normalized, tables)}
+    key = (os.path.abspath(out_dir), normalized,
+           tuple((t, _version(p)) for t, p in sorted(used.items())))
+
+    if use_cache:
+        with _lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key].copy()
+
+    con = connect(used)
+    try:
+        result = con.sql(normalized)
+        if result is None:
+            raise ValueError("Only queries that return rows are supported")
+        df = result.df()
+    finally:
+        con.close()
+
+    with _lock:
+        _cache[key] = df
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return df.copy()
+
+
+def describe(out_dir=storage.OUT_DIR):
+    """One row per table: name, files, columns."""
+    rows = []
+    for name, paths in catalog(out_dir).items():
+        schema = ds.dataset(paths, format="ipc").schema
+        rows.append({"table": name, "files": len(paths),
+                     "columns": ", ".join(schema.names)})
+    return rows
+
+
+# ---------------------------------------------------------
+# Streamlit query box
+# ---------------------------------------------------------
+@st.fragment
+def render(out_dir=storage.OUT_DIR):
+    """SQL box over the cleaned tables."""
+    tables = describe(out_dir)
+    if not tables:
+        st.info("No cleaned tables yet — run the modules first.")
+        return
+
+    with st.expander("Available tables"):
+        st.dataframe(tables, hide_index=True)
+
+    default = f"SELECT * FROM {tables[0]['table']} LIMIT 10"
+    text = st.text_area("SQL", value=default, height=120, key="sql_query")
+    if st.button("Run query", key="sql_run"):
+        try:
+            result = query(text, out_dir)
+        except (duckdb.Error, ValueError) as e:
+            st.error(f"❌ {e}")
+            return
+        st.caption(f"{len(result):,} rows")
+        st.dataframe(result, hide_index=True)
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+    if argv[0] == "--tables":
+        for row in describe():
+            print(f"{row['table']} ({row['files']} file(s)): {row['columns']}")
+        return 0
+    try:
+        print(query(" ".join(argv)).to_string(index=False))
+    except (duckdb.Error, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
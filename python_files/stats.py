@@ -0,0 +1,183 @@
+"""One-pass summary statistics and mergeable quantile sketches.
+
+RunningStats keeps count, sum, min, max, mean and the sum of squared
+deviations (M2). Each chunk is reduced with NumPy and folded in with the
+parallel form of Welford's update (Chan et al.), so chunks can be streamed or
+computed in separate processes and combined with merge().
+
+KLLSketch is a KLL quantile sketch: a stack of compactors where level h holds
+items of weight 2**h. Its size is O(k log(n/k)) whatever n is, merging two
+sketches is concatenating their levels, and median/p90 come out without ever
+sorting the full column. Inputs of up to ``exact_limit`` values (64 * k,
+25,600 by default) are also kept verbatim and answered exactly (with the
+same interpolation as pandas); past that the copy is dropped and the
+answers come from the compacted sketch.
+"""
+import math
+
+import numpy as np
+
+
+class KLLSketch:
+    """Mergeable approximate quantiles (rank error roughly 1.7 / k)."""
+
+    def __init__(self, k=400, seed=None, exact_limit=None):
+        self.k = k - (k % 2)  # compactions halve whole pairs
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self.exact_limit = 64 * self.k if exact_limit is None else exact_limit
+        self._exact = []  # every value seen, while n <= exact_limit
+
+    def _keep_exact(self, parts):
+        if self._exact is not None and self.n <= self.exact_limit:
+            self._exact.extend(parts)
+        else:
+            self._exact = None
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _add(self, h, values):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0))
+        self.levels[h] = np.concatenate([self.levels[h], values])
+
+    def _compact(self, values):
+        """Sort ``values`` and keep every other item (random offset)."""
+        values = np.sort(values)
+        return values[self._rng.integers(2)::2]
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                odd = len(level) % 2
+                keep, promote = level[:odd], level[odd:]
+                self.levels[h] = keep
+                self._add(h + 1, self._compact(promote))
+            h += 1
+
+    def update(self, values):
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        self.n += len(x)
+        self._keep_exact([x])
+
+        # Large batches are halved block-wise first: sorting many k-sized
+        # blocks is O(n log k), never a sort of the whole batch.
+        h = 0
+        while len(x) > 2 * self.k:
+            m = len(x) // self.k * self.k
+            self._add(h, x[m:])
+            blocks = np.sort(x[:m].reshape(-1, self.k), axis=1)
+            x = blocks[:, self._rng.integers(2)::2].ravel()
+            h += 1
+        self._add(h, x)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            self._add(h, level)
+        self.n += other.n
+        if other._exact is None:
+            self._exact = None
+        self._keep_exact(other._exact or [])
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        if self.n == 0:
+            return float("nan")
+        if self._exact is not None:
+            return float(np.quantile(np.concatenate(self._exact), q))
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))  # n <= k: exact
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cum = np.cumsum(weights[order])
+        idx = np.searchsorted(cum, q * cum[-1], side="left")
+        return float(items[order][min(idx, len(items) - 1)])
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class RunningStats:
+    """Count/Mean/Std/Min/Max/Sum in one pass, plus a KLL sketch for quantiles."""
+
+    def __init__(self, k=400):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = KLLSketch(k)
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.n = n
+
+    def update(self, values):
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        if len(x) == 0:
+            return self
+
+        mean_b = x.mean()
+        self._combine(len(x), mean_b, float(np.square(x - mean_b).sum()))
+        self.total += float(x.sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.sketch.update(x)
+        return self
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def summary(self):
+        """The dict the modules display: Count/Mean/Std/Min/Median/Max/Sum."""
+        empty = self.n == 0
+        return {
+            "Count": int(self.n),
+            "Mean": float("nan") if empty else float(self.mean),
+            "Std": float(self.std),
+            "Min": float("nan") if empty else self.min,
+            "Median": self.quantile(0.5),
+            "Max": float("nan") if empty else self.max,
+            "Sum": float(self.total),
+        }
+
+
+def summarize(values, chunk_size=1_000_000):
+    """Summary dict for a column, streamed through RunningStats in chunks."""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    x = np.asarray(values, dtype=float)
+    rs = RunningStats()
+    for start in range(0, max(len(x), 1), chunk_size):
+        rs.update(x[start:start + chunk_size])
+    return rs.summary()
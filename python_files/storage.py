@@ -0,0 +1,300 @@
+"""Columnar storage for the cleaned tables in ``output/``.
+
+Every cleaned table is written as an uncompressed Arrow IPC (Feather v2) file,
+which is the primary interchange format: dtypes survive the round trip and
+the file can be memory-mapped, so several processes reading the same table
+share one physical copy through the page cache. A zstd Parquet copy is kept
+for archival, and the CSV export is still written for spreadsheets.
+
+Large tables can instead be written as a Hive-style partitioned dataset
+(``output/<name>/<col>=<value>/part-0.feather``) with a manifest of per-partition
+row counts and min/max statistics, so filtered reads only open the partitions
+that can match. append_partition() grows such a dataset one batch at a time
+(``part-<n>.feather``) without touching the files already written.
+"""
+import json
+import operator
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+OUT_DIR = "output"
+DEFAULT_FORMATS = ("feather", "parquet", "csv")
+
+
+def table_path(name, out_dir=OUT_DIR, fmt="feather"):
+    return os.path.join(out_dir, f"{name}.{fmt}")
+
+
+def save_table(df, name, out_dir=OUT_DIR, formats=DEFAULT_FORMATS):
+    """Write ``df`` as ``output/<name>.<fmt>`` for each format in ``formats``.
+
+    Returns the path of the Feather file (or of the first format written).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    paths = []
+
+    for fmt in formats:
+        path = table_path(name, out_dir, fmt)
+        if fmt == "feather":
+            # Compressed buffers can't be memory-mapped without a copy.
+            feather.write_feather(table, path, compression="uncompressed")
+        elif fmt == "parquet":
+            pq.write_table(table, path, compression="zstd")
+        elif fmt == "csv":
+            df.to_csv(path, index=False)
+        else:
+            raise ValueError(f"Unknown output format: {fmt}")
+        paths.append(path)
+
+    feather_path = table_path(name, out_dir)
+    return feather_path if feather_path in paths else paths[0]
+
+
+def read_table(name, out_dir=OUT_DIR, columns=None):
+    """Memory-map ``output/<name>.feather`` and return it as a pyarrow Table.
+
+    The returned columns point straight into the mapped file; nothing is
+    copied until the data is touched.
+    """
+    source = pa.memory_map(table_path(name, out_dir), "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+
+def is_partitioned(name, out_dir=OUT_DIR):
+    return os.path.exists(os.path.join(out_dir, name, MANIFEST))
+
+
+def table_mtime(name, out_dir=OUT_DIR):
+    """Last write time of a flat table, or of a partitioned dataset's manifest."""
+    path = table_path(name, out_dir)
+    if not os.path.exists(path) and is_partitioned(name, out_dir):
+        path = os.path.join(out_dir, name, MANIFEST)
+    return os.path.getmtime(path)
+
+
+def load_table(name, out_dir=OUT_DIR, columns=None):
+    """Load a cleaned table as a DataFrame.
+
+    Reads the flat Feather file, else a partitioned dataset (all parts),
+    else falls back to Parquet or CSV.
+    """
+    if os.path.exists(table_path(name, out_dir)):
+        # split_blocks keeps null-free numeric columns backed by the mapping.
+        return read_table(name, out_dir, columns).to_pandas(split_blocks=True)
+    if is_partitioned(name, out_dir):
+        return read_partitioned(name, columns=columns, out_dir=out_dir)
+    if os.path.exists(table_path(name, out_dir, "parquet")):
+        return pq.read_table(table_path(name, out_dir, "parquet"), columns=columns).to_pandas()
+    return pd.read_csv(table_path(name, out_dir, "csv"), usecols=columns)
+
+
+def list_tables(out_dir=OUT_DIR):
+    """Names of all cleaned tables in ``out_dir``: flat and partitioned."""
+    if not os.path.isdir(out_dir):
+        return []
+    names = {os.path.splitext(f)[0] for f in os.listdir(out_dir) if f.endswith(".feather")}
+    names.update(f for f in os.listdir(out_dir) if is_partitioned(f, out_dir))
+    return sorted(names)
+
+
+# ---------------------------------------------------------
+# Partitioned datasets
+# ---------------------------------------------------------
+MANIFEST = "_manifest.json"
+
+_OPS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+}
+
+
+def _scalar(v):
+    """Make numpy/pandas scalars JSON-serialisable."""
+    if pd.isna(v):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _write_partition(path, part):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(part, preserve_index=False)
+    feather.write_feather(table, path, compression="uncompressed")
+
+
+def save_partitioned(df, name, partition_cols, out_dir=OUT_DIR, max_workers=None):
+    """Write ``df`` as a partitioned dataset under ``output/<name>/``.
+
+    Partition columns are kept inside each file as well, so dtypes come back
+    unchanged. Partitions are written in parallel; the manifest records the
+    row count and the min/max of every numeric column per partition.
+    Returns the manifest.
+    """
+    root = os.path.join(out_dir, name)
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+
+    numeric = df.select_dtypes("number").columns.tolist()
+    grouped = df.groupby(partition_cols, sort=True, dropna=False, observed=True)
+
+    # One vectorised pass for the statistics of every partition.
+    sizes = grouped.size()
+    mins = grouped[numeric].min() if numeric else None
+    maxs = grouped[numeric].max() if numeric else None
+
+    partitions, jobs = [], []
+    for key, part in grouped:
+        key = key if isinstance(key, tuple) else (key,)
+        rel = os.path.join(
+            *[f"{col}={quote(str(val), safe='')}" for col, val in zip(partition_cols, key)],
+            "part-0.feather",
+        )
+        lookup = key if len(key) > 1 else key[0]
+        partitions.append({
+            "path": rel,
+            "values": {col: _scalar(val) for col, val in zip(partition_cols, key)},
+            "rows": int(sizes.loc[lookup]),
+            "min": {c: _scalar(mins.loc[lookup, c]) for c in numeric} if numeric else {},
+            "max": {c: _scalar(maxs.loc[lookup, c]) for c in numeric} if numeric else {},
+        })
+        jobs.append((os.path.join(root, rel), part))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # pyarrow releases the GIL while writing, so threads run in parallel.
+        list(pool.map(lambda job: _write_partition(*job), jobs))
+
+    manifest = {
+        "partition_cols": list(partition_cols),
+        "rows": int(len(df)),
+        "partitions": partitions,
+    }
+    with open(os.path.join(root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_manifest(name, out_dir=OUT_DIR):
+    with open(os.path.join(out_dir, name, MANIFEST)) as f:
+        return json.load(f)
+
+
+def _may_match(part, col, op, value):
+    """False only when the partition provably holds no matching rows."""
+    if col in part["values"]:
+        v = part["values"][col]
+        if op == "in":
+            return v in value
+        return v is not None and _OPS[op](v, value)
+
+    lo, hi = part["min"].get(col), part["max"].get(col)
+    if lo is None or hi is None:
+        return True  # no statistics -> can't prune
+    if op == "==":
+        return lo <= value <= hi
+    if op == "in":
+        return any(lo <= v <= hi for v in value)
+    if op in ("<", "<="):
+        return _OPS[op](lo, value)
+    if op in (">", ">="):
+        return _OPS[op](hi, value)
+    return True
+
+
+def prune_partitions(name, filters=(), out_dir=OUT_DIR):
+    """Manifest entries of the partitions that can satisfy every filter.
+
+    ``filters`` is a sequence of ``(column, op, value)`` tuples with op one of
+    ==, !=, <, <=, >, >= or "in".
+    """
+    manifest = load_manifest(name, out_dir)
+    return [
+        p for p in manifest["partitions"]
+        if all(_may_match(p, col, op, value) for col, op, value in filters)
+    ]
+
+
+def read_partitioned(name, filters=(), columns=None, out_dir=OUT_DIR):
+    """Read the rows of a partitioned dataset that satisfy ``filters``.
+
+    Only partitions that survive pruning are memory-mapped; the filters are
+    then applied row-wise to what was read.
+    """
+    root = os.path.join(out_dir, name)
+    parts = prune_partitions(name, filters, out_dir)
+    filter_cols = [col for col, _, _ in filters]
+    read_cols = None if columns is None else list(dict.fromkeys(list(columns) + filter_cols))
+
+    tables = []
+    for p in parts:
+        source = pa.memory_map(os.path.join(root, p["path"]), "r")
+        table = pa.ipc.open_file(source).read_all()
+        tables.append(table if read_cols is None else table.select(read_cols))
+
+    if not tables:
+        return pd.DataFrame(columns=columns)
+
+    df = pa.concat_tables(tables).to_pandas(split_blocks=True)
+
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in filters:
+        if op == "in":
+            mask &= df[col].isin(value).to_numpy()
+        else:
+            mask &= _OPS[op](df[col], value).to_numpy()
+    df = df[mask].reset_index(drop=True)
+
+    return df if columns is None else df[list(columns)]
+
+
+def append_partition(df, name, out_dir=OUT_DIR, csv=True):
+    """Append ``df`` to ``output/<name>/`` as a new part file.
+
+    Existing parts are never rewritten: the new batch gets its own file and
+    manifest entry (with min/max statistics, so read_partitioned() can prune
+    by them), and its rows are appended to ``output/<name>.csv``.
+    Returns the manifest.
+    """
+    root = os.path.join(out_dir, name)
+    path = os.path.join(root, MANIFEST)
+    if os.path.exists(path):
+        manifest = load_manifest(name, out_dir)
+    else:
+        manifest = {"partition_cols": [], "rows": 0, "partitions": []}
+
+    numeric = df.select_dtypes("number").columns.tolist()
+    rel = f"part-{len(manifest['partitions']):06d}.feather"
+    _write_partition(os.path.join(root, rel), df)
+
+    manifest["rows"] += int(len(df))
+    manifest["partitions"].append({
+        "path": rel,
+        "values": {},
+        "rows": int(len(df)),
+        "min": {c: _scalar(df[c].min()) for c in numeric},
+        "max": {c: _scalar(df[c].max()) for c in numeric},
+    })
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+    if csv:
+        csv_path = table_path(name, out_dir, "csv")
+        df.to_csv(csv_path, mode="a", index=False, header=not os.path.exists(csv_path))
+
+    return manifest
@@ -0,0 +1,165 @@
+"""Server-side paginated browser for the cleaned tables.
+
+The whole frame stays in the Streamlit server process (memory-mapped from its
+Feather file); the browser only ever receives one page. TableView caches a
+sort permutation per (column, direction) and a boolean mask per filter, so
+changing page, sort or filter is an index lookup rather than a re-sort.
+Column statistics are computed the first time a column is inspected and
+cached with the view.
+"""
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from python_files import stats, storage
+
+PAGE_SIZES = [25, 50, 100, 250]
+MASK_CACHE_SIZE = 32
+
+_RANGE = re.compile(r"^\s*(-?[\d.eE+]+)\s*\.\.\s*(-?[\d.eE+]+)\s*$")
+_COMPARE = re.compile(r"^\s*(<=|>=|<|>|==|=|!=)\s*(-?[\d.eE+]+)\s*$")
+
+
+class TableView:
+    """A frame plus cached sort permutations, filter masks and column stats."""
+
+    def __init__(self, df):
+        # Positional row numbers double as index labels; only reset if needed
+        if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0
+                and df.index.step == 1):
+            df = df.reset_index(drop=True)
+        self.df = df
+        self._perms = {}
+        self._masks = OrderedDict()  # least recently used first
+        self._stats = {}
+
+    def sort_permutation(self, col, ascending=True):
+        key = (col, ascending)
+        if key not in self._perms:
+            order = self.df[col].sort_values(ascending=ascending, kind="stable",
+                                             na_position="last")
+            self._perms[key] = order.index.to_numpy()
+        return self._perms[key]
+
+    def filter_mask(self, col, query):
+        """Rows matching ``query`` on ``col``.
+
+        Numeric columns accept "> 5", "<= 3.5", "== 2" or a range "3..7";
+        anything else (including numbers that don't parse, like "....") is
+        a case-insensitive substring match. The last MASK_CACHE_SIZE masks
+        are kept.
+        """
+        key = (col, query)
+        if key in self._masks:
+            self._masks.move_to_end(key)
+        else:
+            s = self.df[col]
+            mask = None
+            if pd.api.types.is_numeric_dtype(s):
+                values = s.to_numpy(dtype=float, na_value=np.nan)
+                try:
+                    m = _RANGE.match(query)
+                    if m:
+                        lo, hi = float(m.group(1)), float(m.group(2))
+                        mask = (values >= lo) & (values <= hi)
+                    m = _COMPARE.match(query)
+                    if m:
+                        op, v = m.group(1), float(m.group(2))
+                        mask = {
+                            "<": values < v, "<=": values <= v, ">": values > v,
+                            ">=": values >= v, "==": values == v, "=": values == v,
+                            "!=": values != v,
+                        }[op]
+                except ValueError:
+                    mask = None
+            if mask is None:
+                mask = s.astype("string").str.contains(query, case=False, regex=False)
+                mask = mask.fillna(False).to_numpy(dtype=bool)
+            self._masks[key] = mask
+            if len(self._masks) > MASK_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        return self._masks[key]
+
+    def rows(self, sort_by=None, ascending=True, filters=()):
+        """Row positions in display order after sorting and filtering."""
+        order = (self.sort_permutation(sort_by, ascending) if sort_by
+                 else np.arange(len(self.df)))
+        if filters:
+            keep = np.ones(len(self.df), dtype=bool)
+            for col, query in filters:
+                keep &= self.filter_mask(col, query)
+            order = order[keep[order]]
+        return order
+
+    def page(self, number, size, sort_by=None, ascending=True, filters=()):
+        """(page_df, matching_row_count) for 0-based page ``number``."""
+        order = self.rows(sort_by, ascending, filters)
+        start = number * size
+        return self.df.iloc[order[start:start + size]], len(order)
+
+    def column_stats(self, col):
+        if col not in self._stats:
+            s = self.df[col]
+            if pd.api.types.is_numeric_dtype(s):
+                summary = stats.summarize(s)
+            else:
+                counts = s.value_counts(dropna=True)
+                summary = {
+                    "Count": int(s.notna().sum()),
+                    "Missing": int(s.isna().sum()),
+                    "Unique": int(len(counts)),
+                    "Top": counts.index[0] if len(counts) else None,
+                    "Top count": int(counts.iloc[0]) if len(counts) else 0,
+                }
+            self._stats[col] = summary
+        return self._stats[col]
+
+
+@st.cache_resource(max_entries=16)
+def get_view(name, mtime, out_dir=storage.OUT_DIR):
+    # mtime is part of the cache key: a rewritten table gets a fresh view.
+    return TableView(storage.load_table(name, out_dir))
+
+
+@st.fragment
+def render(out_dir=storage.OUT_DIR):
+    """Streamlit table browser over every cleaned table in ``out_dir``."""
+    tables = storage.list_tables(out_dir)
+    if not tables:
+        st.info("No cleaned tables yet — run the modules first.")
+        return
+
+    name = st.selectbox("Table", tables, key="tv_table")
+    view = get_view(name, storage.table_mtime(name, out_dir), out_dir)
+    columns = list(view.df.columns)
+
+    c1, c2, c3, c4 = st.columns([3, 1, 3, 3])
+    sort_by = c1.selectbox("Sort by", ["(none)"] + columns, key="tv_sort")
+    ascending = c2.toggle("Ascending", value=True, key="tv_asc")
+    filter_col = c3.selectbox("Filter column", ["(none)"] + columns, key="tv_fcol")
+    query = c4.text_input("Filter (text, > 5, 3..7)", key="tv_query")
+
+    filters = []
+    if filter_col != "(none)" and query.strip():
+        filters.append((filter_col, query.strip()))
+    sort_by = None if sort_by == "(none)" else sort_by
+
+    size = st.select_slider("Rows per page", PAGE_SIZES, value=PAGE_SIZES[1], key="tv_size")
+    total = len(view.rows(sort_by, ascending, filters))
+    n_pages = max(1, -(-total // size))
+    if st.session_state.get("tv_page", 1) > n_pages:
+        st.session_state["tv_page"] = 1  # filter shrank the result
+    number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages,
+                             key="tv_page") - 1
+
+    page, total = view.page(number, size, sort_by, ascending, filters)
+    st.caption(f"Rows {number * size + 1 if total else 0}–{number * size + len(page)} "
+               f"of {total:,} (table has {len(view.df):,})")
+    st.dataframe(page, hide_index=True)
+
+    with st.expander("Column statistics"):
+        stat_col = st.selectbox("Column", columns, key="tv_stat_col")
+        st.write(view.column_stats(stat_col))
@@ -0,0 +1,180 @@
+"""Watch the input workbooks and recompute only the pipelines that use them.
+
+A polling thread stats every workbook in the project root every few
+seconds (the modules read the root copies, so the ones in ``data/`` are
+not watched). When one changes, its parse is prefetched again and every
+pipeline (module) that depends on it is queued for a background recompute.
+Each recompute runs in its own process within a time and memory budget
+(isolation.run()), several at a time; a derived pipeline first waits for
+the queued recomputes of the pipelines it reads (DEPENDS). Results are kept
+per module with a version number, so the dashboard keeps serving the cached output of untouched
+modules and swaps in fresh output as soon as a recompute finishes. An
+``on_result`` callback lets the background worker publish each result.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from python_files import isolation, prefetch
+
+# Pipeline (module name) -> workbooks it reads.
+PIPELINES = {
+    "Annual_Macroeconomic_Factors":  ["Annual_Macroeconomic_Factors.xlsx"],
+    "Housing":                       ["Housing.xlsx"],
+    "Population_report":             ["PopulationReport.xlsx"],
+    "HomelessYears":                 ["HomelessYears.xlsx"],
+    "Housing_Macroeconomic_Factors": ["Housing_Macroeconomic_Factors_US(good).xlsx"],
+    "Regional_Cost_of_Living":       ["Regional Cost of Living.xlsx"],
+    "poverty_report":                ["PovertyReport.xlsx"],
+    "Unemployment":                  ["UnemploymentReport.xlsx"],
+    # Joins the three cleaned state reports, so it runs after them
+    "State_Panel":                   ["PopulationReport.xlsx", "PovertyReport.xlsx",
+                                      "UnemploymentReport.xlsx"],
+    "Housing_Stress_Clusters":       ["PopulationReport.xlsx", "PovertyReport.xlsx",
+                                      "UnemploymentReport.xlsx"],
+}
+
+# Pipeline -> pipelines whose cleaned tables it reads.
+DEPENDS = {
+    "State_Panel":             ["Population_report", "poverty_report", "Unemployment"],
+    "Housing_Stress_Clusters": ["State_Panel"],
+}
+
+# At least two, so one module running into its budget never stalls the queue
+MAX_PARALLEL = max(2, min(4, os.cpu_count() or 1))
+
+# Workbook -> keyword arguments the owning module passes to read_excel().
+READ_KWARGS = {
+    "Annual_Macroeconomic_Factors.xlsx":           {"sheet_name": "in"},
+    "Housing.xlsx":                                {"sheet_name": "in"},
+    "PopulationReport.xlsx":                       {"sheet_name": "PopulationReport", "header": None},
+    "HomelessYears.xlsx":                          {},
+    "Housing_Macroeconomic_Factors_US(good).xlsx": {},
+    "Regional Cost of Living.xlsx":                {},
+    "PovertyReport.xlsx":                          {"sheet_name": "PovertyReport", "header": None},
+    "UnemploymentReport.xlsx":                     {"sheet_name": "UnemploymentReport", "header": None},
+}
+
+WATCH_DIRS = ["."]
+
+
+def dependents(path, pipelines=PIPELINES, root="."):
+    """Pipelines that read ``path``; only workbooks directly in ``root`` count."""
+    if os.path.abspath(os.path.dirname(path)) != os.path.abspath(root):
+        return []
+    name = os.path.basename(path)
+    return [module for module, files in pipelines.items() if name in files]
+
+
+class Watcher:
+    """Polls the workbooks and keeps the latest result of every pipeline."""
+
+    def __init__(self, modules, read_kwargs=READ_KWARGS, interval=2.0, watch_dirs=WATCH_DIRS,
+                 pipelines=PIPELINES, on_result=None, depends=DEPENDS,
+                 max_parallel=MAX_PARALLEL):
+        self.modules = list(modules)
+        self.read_kwargs = read_kwargs
+        self.on_result = on_result
+        self.interval = interval
+        self.watch_dirs = watch_dirs
+        self.pipelines = {m: pipelines.get(m, []) for m in self.modules}
+        self.depends = {m: [d for d in depends.get(m, []) if d in self.modules]
+                        for m in self.modules}
+
+        self._results = {}   # module -> result dict from isolation.run
+        self._pending = {}   # module -> Future of the queued recompute
+        self._lock = threading.Lock()
+        # Each thread just waits on one module's child process
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel,
+                                            thread_name_prefix="recompute")
+        self._mtimes = self._scan()
+
+        for module in self.modules:
+            self.submit(module)
+
+        threading.Thread(target=self._poll, name="workbook-watcher", daemon=True).start()
+
+    def _scan(self):
+        mtimes = {}
+        for d in self.watch_dirs:
+            if not os.path.isdir(d):
+                continue
+            for f in os.listdir(d):
+                if f.endswith(".xlsx") and not f.startswith("~$"):
+                    path = os.path.join(d, f)
+                    mtimes[path] = os.path.getmtime(path)
+        return mtimes
+
+    def _poll(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                current = self._scan()
+            except OSError:
+                continue  # a file vanished mid-scan; try again next tick
+            changed = [p for p, m in current.items() if self._mtimes.get(p) != m]
+            self._mtimes = current
+
+            affected = set()
+            for path in changed:
+                affected.update(dependents(path, self.pipelines))
+            if not affected:
+                continue
+
+            # Re-parse the changed root workbooks in parallel, then recompute
+            specs = {f: self.read_kwargs.get(f, {}) for m in affected
+                     for f in self.pipelines[m]}
+            prefetch.start(specs)
+            # In PIPELINES order, so derived tables recompute after their inputs
+            for module in self.modules:
+                if module in affected:
+                    self.submit(module)
+
+    def _compute(self, module_name, inputs):
+        # Inputs were queued first, so they never wait on this thread
+        wait(inputs)
+        specs = {f: self.read_kwargs[f] for f in self.pipelines[module_name]
+                 if f in self.read_kwargs}
+        # Waiting for the shared parses counts against the module's time
+        # budget; files not parsed in time are read inside the child instead
+        timeout, _ = isolation.budget(module_name)
+        start = time.monotonic()
+        frames = prefetch.parsed(specs, timeout=timeout)
+        result = isolation.run(module_name, frames=frames, spent=time.monotonic() - start)
+        with self._lock:
+            previous = self._results.get(module_name)
+            result["version"] = previous["version"] + 1 if previous else 1
+            self._results[module_name] = result
+        if self.on_result is not None:
+            self.on_result(module_name, result)
+        return result
+
+    def submit(self, module_name):
+        """Queue a recompute of ``module_name`` unless one is already queued.
+
+        A recompute that has already started may have read the old file, so
+        it doesn't count as queued.
+        """
+        with self._lock:
+            future = self._pending.get(module_name)
+            if future is None or future.done() or future.running():
+                inputs = [self._pending[d] for d in self.depends[module_name]
+                          if d in self._pending]
+                future = self._executor.submit(self._compute, module_name, inputs)
+                self._pending[module_name] = future
+            return future
+
+    def result(self, module_name, wait=True):
+        """Latest result for ``module_name``; waits for the first one if asked."""
+        with self._lock:
+            result = self._results.get(module_name)
+            pending = self._pending.get(module_name)
+        if result is None and wait and pending is not None:
+            return pending.result()
+        return result
+
+    def version(self, module_name):
+        with self._lock:
+            result = self._results.get(module_name)
+        return result["version"] if result else 0
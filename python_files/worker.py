@@ -0,0 +1,62 @@
+"""Long-running background worker that computes every module.
+
+Run with ``python -m python_files.worker`` from the project root (the app
+starts it automatically). The worker owns all loading, cleaning and figure
+rendering: it watches the workbooks, re-runs the affected modules (each in
+its own budgeted process, see isolation) and publishes each recorded result
+to result_store, where the Streamlit app picks it up. Only one worker runs at a time (an exclusive file lock).
+"""
+import fcntl
+import os
+import sys
+import time
+
+from python_files import prefetch, result_store, watcher
+
+POLL_SECONDS = 1.0
+
+
+def _acquire_lock():
+    os.makedirs(result_store.STORE_DIR, exist_ok=True)
+    handle = open(result_store.LOCK_FILE, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle  # keep it open: the lock lives as long as the handle
+
+
+def _publish(module_name, result):
+    version = result_store.publish(module_name, result)
+    status = result.get("status", "ok").upper()
+    print(f"{time.strftime('%H:%M:%S')} {module_name} v{version} {status} "
+          f"({result['seconds']:.1f}s)", flush=True)
+
+
+def main(modules=None):
+    lock = _acquire_lock()
+    if lock is None:
+        print("Another worker is already running.", flush=True)
+        return 1
+
+    modules = modules or list(watcher.PIPELINES)
+    result_store.beat()
+    print(f"Worker {os.getpid()} computing {', '.join(modules)}", flush=True)
+
+    # Parse every workbook up front, in parallel with the first module runs
+    prefetch.start(watcher.READ_KWARGS)
+    runs = watcher.Watcher(modules, on_result=_publish)
+
+    while True:
+        for module_name in result_store.take_requests():
+            if module_name in runs.modules:
+                runs.submit(module_name)
+        result_store.beat()
+        time.sleep(POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
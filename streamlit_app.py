@@ -3,9 +3,19 @@ import os
 import sys
 import traceback
 
+from python_files import result_store, runner, sql, table_viewer
+
+# How often each section checks the result store for a newer version
+REFRESH_SECONDS = 5
+
 st.set_page_config(layout="wide")
 st.title("📊 Housing Market Analysis — Debug & Run")
 
+# All computation happens in the background worker; the page only reads
+# its published results.
+if result_store.ensure_worker():
+    st.info("⏳ Started the background worker — results appear as they finish.")
+
 st.subheader("📁 Current Directory Structure")
 
 try:
@@ -30,9 +40,13 @@ modules = {
     "Macroeconomic Factors":  "Annual_Macroeconomic_Factors",
     "Housing":                "Housing",
     "Population Report":      "Population_report",
+    "Poverty Report":         "poverty_report",
+    "Unemployment":           "Unemployment",
     "Homelessness Trend":     "HomelessYears",
     "Housing Macroeconomic Factors": "Housing_Macroeconomic_Factors",
-    "Regional Cost of Living": "Regional_Cost_of_Living"
+    "Regional Cost of Living": "Regional_Cost_of_Living",
+    "State Panel":            "State_Panel",
+    "Housing Stress Clusters": "Housing_Stress_Clusters",
 }
 
 loaded_modules = {}
@@ -53,6 +67,8 @@ data_files = [
     "Annual_Macroeconomic_Factors.xlsx",
     "Housing.xlsx",
     "PopulationReport.xlsx",
+    "PovertyReport.xlsx",
+    "UnemploymentReport.xlsx",
     "HomelessYears.xlsx",
     "Housing_Macroeconomic_Factors_US(good).xlsx",
     "Regional Cost of Living.xlsx",
@@ -66,18 +82,63 @@ for file in data_files:
 
 st.subheader("▶️ Running Data Cleaning Scripts")
 
+
+@st.cache_resource(max_entries=64)
+def load_result(module_name, version):
+    # Published versions never change, so one load is shared by every session.
+    return result_store.load(module_name, version)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def render_section(label, module_name):
+    info = result_store.latest_info(module_name)
+    if info is None:
+        st.info(f"⏳ Waiting for the worker to finish `{label}`…")
+        return
+
+    # A failed run keeps showing the last good result, with a warning
+    shown = info["version"] if info["ok"] or not info.get("good_version") else info["good_version"]
+    try:
+        result = load_result(module_name, shown)
+    except FileNotFoundError:
+        st.info("⏳ A newer result is being published…")
+        return
+
+    if not info["ok"] and shown != info["version"]:
+        reason = "timed out" if info.get("status") == "timeout" else "failed"
+        st.warning(f"⚠️ The latest run of `{label}` {reason} — showing the last good "
+                   f"result (v{shown}).")
+        with st.expander("Error details"):
+            st.code(info.get("error") or "")
+    runner.replay(result["records"])
+
+    if result["ok"]:
+        st.success(f"✓ Finished running `{label}` "
+                   f"(v{result['version']}, {result['seconds']:.1f}s)")
+    else:
+        st.error(f"❌ Error in `{label}` during execution")
+        st.code(result["error"])
+
+    if st.button("🔁 Recompute", key=f"recompute_{module_name}"):
+        result_store.request(module_name)
+        st.toast(f"Queued `{label}` for the worker")
+
+
+runnable = {label: module for label, module in loaded_modules.items() if hasattr(module, "main")}
+
 for label, module in loaded_modules.items():
     st.write(f"### 🔧 Running `{label}`")
 
-    if hasattr(module, "main"):
-        try:
-            module.main()
-            st.success(f"✓ Finished running `{label}`")
-        except Exception as e:
-            st.error(f"❌ Error in `{label}` during execution")
-            st.code(traceback.format_exc())
+    if label in runnable:
+        render_section(label, module.__name__.split(".")[-1])
     else:
         st.warning(f"⚠️ Module `{label}` has no main() function")
 
 
+st.subheader("🗂️ Browse Cleaned Tables")
+table_viewer.render()
+
+st.subheader("🧮 Query Cleaned Tables (SQL)")
+sql.render()
+
 st.success("🎉 All Systems Complete — Check output folder for results!")
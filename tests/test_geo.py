@@ -0,0 +1,18 @@
+import pandas as pd
+
+from python_files import geo
+
+
+def test_footnoted_state_rows_are_kept():
+    df = pd.DataFrame({
+        "Name": ["United States", "Alabama*", "Texas 2/", "Ohio (1)", "Source: Census Bureau"],
+        "Value": [1, 2, 3, 4, 5],
+    })
+    kept, level = geo.drop_aggregate_rows(df)
+    assert level == "state"
+    assert kept["Name"].tolist() == ["Alabama*", "Texas 2/", "Ohio (1)"]
+
+
+def test_detect_level_normalizes_names():
+    levels = geo.detect_level(["U.S.", "South Region", "Texas2", "Autauga County 1/"])
+    assert levels.tolist() == ["nation", "region", "state", "county"]
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from python_files import resample
+
+
+def test_yoy_skips_missing_months():
+    dates = pd.date_range("2020-01-01", periods=25, freq="MS")
+    df = pd.DataFrame({"Date": dates, "x": np.arange(100.0, 125.0)})
+    df = df[df["Date"] != "2020-06-01"]  # one month missing
+    out = resample.MultiResolution(df).rolling("Monthly")
+
+    # Each month is compared with the same month a year earlier
+    expected = (df.set_index("Date")["x"] / (df.set_index("Date")["x"] - 12) - 1) * 100
+    assert np.isclose(out.loc["2021-07-01", "x_yoy"], expected["2021-07-01"])
+    assert np.isclose(out.loc["2021-05-01", "x_yoy"], expected["2021-05-01"])
+    # Its counterpart month is missing, so June 2021 has no YoY change
+    assert np.isnan(out.loc["2021-06-01", "x_yoy"])
+
+
+def test_rolling_mean_matches_pandas_min_periods():
+    values = np.array([1.0, np.nan, 3.0, 4.0, np.nan, 6.0])
+    expected = pd.Series(values).rolling(3, min_periods=1).mean().to_numpy()
+    assert np.allclose(resample.rolling_mean(values, 3, min_periods=1), expected, equal_nan=True)